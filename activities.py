@@ -0,0 +1,159 @@
+import os
+import numpy as np
+import pandas as pd
+from data_loader import read_log
+from edits import parse_hours
+from model import day_number, format_days, to_day_numbers
+from storage import _atomic_write
+
+# daily_data.csv: one row per activity entry, several per day
+ACTIVITY_COLUMNS = ["Date", "Activity", "Exercise Score", "Hour"]
+
+# Score per hour of each activity. Anything else scores like the single
+# Hours log (hours / 3).
+DEFAULT_WEIGHT = 1 / 3
+ACTIVITY_WEIGHTS = {
+    "Running": 0.5,
+    "Swimming": 0.5,
+    "Cycling": 0.4,
+    "Strength": 0.4,
+    "Walking": 0.25,
+    "Yoga": 0.25,
+}
+
+
+# Hours per (day, activity): a float32 Series on a sorted (int32 day number,
+# categorical activity) MultiIndex, with entries for the same day and
+# activity summed. Date ranges are sliced by binary search on the sorted index
+# and activities filtered by category code, and every total is a groupby on
+# an index level, so nothing rescans or reparses the raw entries.
+class ActivityLog:
+    def __init__(self, hours):
+        self.hours = hours
+
+    @classmethod
+    def from_raw(cls, raw):
+        days = to_day_numbers(raw["Date"]) if len(raw) else np.zeros(0, dtype=np.int32)
+        frame = pd.DataFrame({
+            "day": days,
+            "activity": pd.Categorical(pd.Series(raw["Activity"], dtype=object).astype(str).str.strip()),
+            "hours": parse_hours(raw["Hour"]).astype(np.float32),
+        })
+        frame = frame[frame["hours"] > 0]
+        return cls(frame.groupby(["day", "activity"], observed=True, sort=True)["hours"].sum())
+
+    def __len__(self):
+        return len(self.hours)
+
+    @property
+    def nbytes(self):
+        return int(self.hours.memory_usage(index=True, deep=True))
+
+    def activities(self):
+        return list(self.hours.index.levels[1])
+
+    # Score of each (day, activity): hours times the activity's weight
+    def scores(self, weights=None):
+        weights = {**ACTIVITY_WEIGHTS, **(weights or {})}
+        categories = self.hours.index.levels[1]
+        per_code = np.array([weights.get(a, DEFAULT_WEIGHT) for a in categories], dtype=np.float64)
+        codes = self.hours.index.codes[1]
+        return pd.Series(self.hours.to_numpy(dtype=np.float64) * per_code[codes], index=self.hours.index)
+
+    # Entries between two dates ('YYYY-MM-DD', inclusive, either end open) for
+    # the given activities (all when None)
+    def _select(self, series, start=None, end=None, activities=None):
+        lo, hi = series.index.slice_locs(
+            day_number(start) if start else None, day_number(end) if end else None)
+        series = series.iloc[lo:hi]
+        if activities is not None:
+            wanted = self.hours.index.levels[1].get_indexer(list(activities))
+            series = series[np.isin(series.index.codes[1], wanted[wanted >= 0])]
+        return series
+
+    # Activity and Hour of every entry on one day ('YYYY-MM-DD')
+    def day_entries(self, date):
+        day = day_number(date)
+        lo, hi = self.hours.index.slice_locs(day, day)
+        entries = self.hours.iloc[lo:hi]
+        return pd.DataFrame({
+            "Activity": entries.index.get_level_values(1).astype(str),
+            "Hour": entries.to_numpy(dtype=np.float64).round(2),
+        })
+
+    # Hours and Score per day with any activity logged, oldest first
+    def daily_totals(self, start=None, end=None, activities=None, weights=None):
+        hours = self._select(self.hours, start, end, activities).groupby(level=0).sum()
+        scores = self._select(self.scores(weights), start, end, activities).groupby(level=0).sum()
+        return pd.DataFrame({
+            "Date": format_days(hours.index.to_numpy()),
+            "Hours": np.round(hours.to_numpy(dtype=np.float64), 2),
+            "Score": np.round(scores.to_numpy(), 2),
+        })
+
+    # Score per period (freq "W" for ISO weeks, "M" for months) and activity,
+    # one column per activity
+    def breakdown(self, start=None, end=None, activities=None, weights=None, freq="W"):
+        scores = self._select(self.scores(weights), start, end, activities)
+        days = scores.index.get_level_values(0).to_numpy().astype("datetime64[D]")
+        if freq == "W":
+            # 1970-01-01 was a Thursday; weeks start on Monday
+            periods = days - (days.astype(np.int64) + 3) % 7
+        else:
+            periods = days.astype("datetime64[M]").astype("datetime64[D]")
+        table = scores.groupby([periods, scores.index.get_level_values(1)], observed=True).sum().unstack(fill_value=0.0)
+        table.index = pd.DatetimeIndex(table.index).strftime("%Y-%m-%d")
+        return table.round(2)
+
+
+# Activity entries in a CSV (daily_data.csv), parsed through the same
+# size/mtime cache as the exercise log. Adding entries appends to the file,
+# which the cache picks up by parsing only the new tail; replacing a day's
+# entries rewrites the file atomically.
+class ActivityStorage:
+    def __init__(self, path="daily_data.csv"):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        if not self.exists():
+            return pd.DataFrame(columns=ACTIVITY_COLUMNS)
+        return read_log(self.path)["raw"].copy()
+
+    def load_log(self):
+        if not self.exists():
+            return ActivityLog.from_raw(pd.DataFrame(columns=ACTIVITY_COLUMNS))
+        # Kept on the cache entry, so it is rebuilt only when the file changes
+        entry = read_log(self.path)
+        if "activities" not in entry:
+            entry["activities"] = ActivityLog.from_raw(entry["raw"])
+        return entry["activities"]
+
+    def _rows(self, entries, weights=None):
+        entries = pd.DataFrame(entries).reindex(columns=ACTIVITY_COLUMNS)
+        entries["Activity"] = entries["Activity"].astype(object).fillna("").astype(str).str.strip()
+        hours = parse_hours(entries["Hour"])
+        weights = {**ACTIVITY_WEIGHTS, **(weights or {})}
+        entries["Hour"] = hours
+        entries["Exercise Score"] = np.round(hours * entries["Activity"].map(
+            lambda a: weights.get(a, DEFAULT_WEIGHT)).to_numpy(dtype=np.float64), 2)
+        return entries[(entries["Activity"] != "") & (hours > 0)]
+
+    # Append entries (Date, Activity, Hour); the score is filled in from the weights
+    def add_entries(self, entries, weights=None):
+        rows = self._rows(entries, weights)
+        if len(rows) == 0:
+            return
+        new_file = not self.exists()
+        with open(self.path, "a", newline="") as f:
+            rows.to_csv(f, index=False, header=new_file)
+
+    # Replace every entry of one day ('YYYY-MM-DD') with the given ones
+    def save_day(self, date, entries, weights=None):
+        rows = self._rows(pd.DataFrame(entries).assign(Date=date), weights)
+        raw = self.load()
+        merged = pd.concat([raw[raw["Date"].astype(str) != date], rows], ignore_index=True)
+        merged = merged.sort_values("Date", kind="stable")[ACTIVITY_COLUMNS]
+        _atomic_write(self.path, lambda tmp: merged.to_csv(tmp, index=False))
@@ -0,0 +1,51 @@
+import pandas as pd
+import streamlit as st
+from activities import ACTIVITY_WEIGHTS, DEFAULT_WEIGHT
+from windowed_editor import rerun_section
+
+# Days of per-day totals listed under the breakdown chart
+TOTALS_DAYS = 30
+
+
+# Multi-activity log: the entries of one day in an editable table (several
+# activities per day, each with its hours), then per-activity totals and a
+# stacked breakdown chart for the selected activities. Everything below the
+# editor comes from the indexed ActivityLog, not from the raw entries.
+def activity_log_panel(storage, today, key="activities"):
+    today = pd.Timestamp(today).date()
+    log = storage.load_log()
+
+    day = st.date_input("Day", today, max_value=today, key=f"{key}_day").strftime("%Y-%m-%d")
+    edited = st.data_editor(
+        log.day_entries(day),
+        column_config={
+            "Activity": st.column_config.TextColumn(required=True, help="e.g. " + ", ".join(ACTIVITY_WEIGHTS)),
+            "Hour": st.column_config.NumberColumn(min_value=0.0, step=0.25),
+        },
+        num_rows="dynamic",
+        hide_index=True,
+        key=f"{key}_editor_{day}",
+    )
+    if st.button("Save activities", key=f"{key}_save"):
+        storage.save_day(day, edited)
+        rerun_section()
+
+    if not len(log):
+        st.info("No activities logged yet.")
+        return
+
+    selected = st.multiselect("Activities", log.activities(), default=log.activities(), key=f"{key}_filter")
+    freq = st.radio("Per", ["W", "M"], format_func={"W": "Week", "M": "Month"}.get, horizontal=True,
+                    key=f"{key}_freq")
+    table = log.breakdown(activities=selected, freq=freq)
+    if len(table):
+        from charts import render_activity_chart
+        theme = st.get_option("theme.base") or "light"
+        st.image(render_activity_chart(table, theme=theme), use_container_width=True)
+
+    start = (pd.Timestamp(today) - pd.Timedelta(days=TOTALS_DAYS - 1)).strftime("%Y-%m-%d")
+    st.write(log.daily_totals(start=start, activities=selected).iloc[::-1].reset_index(drop=True))
+    weights = pd.DataFrame({"Activity": selected,
+                            "Score per hour": [ACTIVITY_WEIGHTS.get(a, DEFAULT_WEIGHT) for a in selected]})
+    with st.expander("Scoring weights"):
+        st.dataframe(weights.round(3), hide_index=True)
@@ -0,0 +1,175 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from gap_fill import midwest_today
+from model import DayLog, day_number, format_days, to_day_numbers
+from storage import COLUMNS, _atomic_write, drop_padding, merge_changes
+
+# Binary archive of many users' exercise logs, read through a memory map.
+# Layout (little-endian):
+#   header   MAGIC, user count, row count, byte length of the names
+#   index    int64[users + 1], user i's rows are index[i]:index[i + 1]
+#   day      int32[rows], day numbers (days since 1970-01-01, as in DayLog)
+#   hours    float32[rows], NaN when Hours was blank
+#   score    float32[rows]
+#   names    JSON list of user names, in index order
+# Each user's rows are sorted by day, so a date range is two binary searches,
+# and every slice is a read-only view into the mapped file: nothing is parsed
+# or copied until it's used, and the OS shares the pages between processes.
+# Only recorded days are stored (no padding), like the sparse CSV log.
+# Usage: python archive.py pack ARCHIVE CSV_OR_DIR... | unpack ARCHIVE OUT_DIR [--user NAME]
+#            | info ARCHIVE
+
+MAGIC = b"EXARCH01"
+HEADER = struct.Struct("<8sqqq")
+
+
+# Sorted day/hours/score arrays of one Date/Score/Hours frame, padding dropped
+def _columns(frame):
+    frame = drop_padding(merge_changes(pd.DataFrame(columns=COLUMNS), frame))
+    hours = pd.to_numeric(frame["Hours"].str.strip(), errors="coerce").to_numpy(dtype=np.float32)
+    score = pd.to_numeric(frame["Score"], errors="coerce").fillna(0).to_numpy(dtype=np.float32)
+    return to_day_numbers(frame["Date"]), hours, score
+
+
+# Write an archive of {user: Date/Score/Hours frame}
+def write_archive(path, logs):
+    names = list(logs)
+    columns = [_columns(logs[name]) for name in names]
+    index = np.zeros(len(names) + 1, dtype="<i8")
+    index[1:] = np.cumsum([len(day) for day, _, _ in columns])
+    encoded = json.dumps(names).encode()
+
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(names), int(index[-1]), len(encoded)))
+            f.write(index.tobytes())
+            for k, dtype in enumerate(("<i4", "<f4", "<f4")):
+                for column in columns:
+                    f.write(np.ascontiguousarray(column[k], dtype=dtype).tobytes())
+            f.write(encoded)
+    _atomic_write(path, write)
+
+
+class Archive:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, users, rows, names_len = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an exercise archive")
+        offset = HEADER.size
+        self.index = np.frombuffer(self._map, "<i8", users + 1, offset)
+        offset += self.index.nbytes
+        self.day = np.frombuffer(self._map, "<i4", rows, offset)
+        self.hours = np.frombuffer(self._map, "<f4", rows, offset + 4 * rows)
+        self.score = np.frombuffer(self._map, "<f4", rows, offset + 8 * rows)
+        self.names = json.loads(self._map[offset + 12 * rows:offset + 12 * rows + names_len])
+        self._positions = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, user):
+        return user in self._positions
+
+    # Row range of a user's days between two dates (inclusive, 'YYYY-MM-DD'
+    # or day numbers); either end may be open
+    def _rows(self, user, start=None, end=None):
+        if user not in self._positions:
+            raise KeyError(user)
+        i = self._positions[user]
+        lo, hi = int(self.index[i]), int(self.index[i + 1])
+        day = self.day[lo:hi]
+        if start is not None:
+            lo += int(np.searchsorted(day, day_number(start), side="left"))
+        if end is not None:
+            hi = int(self.index[i]) + int(np.searchsorted(day, day_number(end), side="right"))
+        return lo, max(lo, hi)
+
+    # Zero-copy day/hours/score views of a user's date range
+    def slice(self, user, start=None, end=None):
+        lo, hi = self._rows(user, start, end)
+        return self.day[lo:hi], self.hours[lo:hi], self.score[lo:hi]
+
+    # A user's range as a Date/Score/Hours frame, in the exercise_data.csv layout
+    def frame(self, user, start=None, end=None):
+        day, hours, score = self.slice(user, start, end)
+        hours = np.round(hours.astype(np.float64), 4)
+        return pd.DataFrame({
+            "Date": format_days(day),
+            "Score": np.round(score.astype(np.float64), 2),
+            "Hours": np.where(np.isnan(hours), "", hours.astype(str)),
+        })
+
+    # A user's log through today. The DayLog wraps the mapped arrays directly
+    # when every day has hours (apply_edits copies them before writing); days
+    # kept only for their score go through DayLog.from_raw, which derives
+    # hours from the score.
+    def day_log(self, user, today=None, start=None, end=None):
+        day, hours, _ = self.slice(user, start, end)
+        if not np.all(hours > 0):
+            return DayLog.from_raw(self.frame(user, start, end), today)
+        today = day_number(today if today is not None else midwest_today())
+        return DayLog(day, hours, max(today, int(day[-1])) if len(day) else today)
+
+
+_archives = {}
+
+
+# Archives are opened once per process and path
+def open_archive(path):
+    if path not in _archives:
+        _archives[path] = Archive(path)
+    return _archives[path]
+
+
+# CSV logs (files, or directories of them) keyed by user, the file's stem
+def csv_logs(paths):
+    files = []
+    for path in map(Path, paths):
+        files += sorted(path.glob("*.csv")) if path.is_dir() else [path]
+    return {f.stem: pd.read_csv(f, dtype={"Hours": str}, keep_default_na=False) for f in files}
+
+
+def export_csv(archive, out_dir, users=None):
+    os.makedirs(out_dir, exist_ok=True)
+    for user in users or archive.names:
+        archive.frame(user).to_csv(Path(out_dir) / f"{user}.csv", index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack exercise logs into a memory-mapped archive, or unpack one")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="write an archive of CSV logs, one user per file")
+    pack.add_argument("archive")
+    pack.add_argument("inputs", nargs="+", help="CSV files or directories of them")
+    unpack = commands.add_parser("unpack", help="write each user's log back to OUT_DIR/USER.csv")
+    unpack.add_argument("archive")
+    unpack.add_argument("out_dir")
+    unpack.add_argument("--user", action="append", help="only this user (repeatable)")
+    info = commands.add_parser("info", help="users, days and size of an archive")
+    info.add_argument("archive")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        logs = csv_logs(args.inputs)
+        write_archive(args.archive, logs)
+        print(f"packed {len(logs):,} logs into {args.archive} ({os.path.getsize(args.archive):,} bytes)")
+    elif args.command == "unpack":
+        archive = Archive(args.archive)
+        export_csv(archive, args.out_dir, args.user)
+        print(f"wrote {len(args.user or archive.names):,} logs to {args.out_dir}")
+    else:
+        archive = Archive(args.archive)
+        print(f"{len(archive):,} users, {len(archive.day):,} days, {os.path.getsize(args.archive):,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import atexit
+import threading
+import time
+import pandas as pd
+from storage import COLUMNS
+
+# Seconds without new edits before queued rows are written, and the longest
+# an edit waits while edits keep arriving
+DEBOUNCE_SECONDS = 2.0
+MAX_WAIT_SECONDS = 10.0
+
+
+# Write-behind saving for one storage backend. queue() only records the rows
+# (the last value per date wins), so reruns never wait on the disk. A daemon thread writes them
+# with one save_changes() call once no edit has arrived for `delay` seconds.
+# Failed writes are kept and retried; flush() writes synchronously, close()
+# flushes and stops the thread, and every saver is flushed when the
+# interpreter exits.
+class AutoSaver:
+    def __init__(self, storage, delay=DEBOUNCE_SECONDS, max_wait=MAX_WAIT_SECONDS):
+        self.storage = storage
+        self.delay = delay
+        self.max_wait = max_wait
+        self.stats = {'queued': 0, 'coalesced': 0, 'flushes': 0, 'rows_written': 0}
+        self.last_error = None
+        self._pending = {}  # date -> row tuple
+        self._first = self._last = None
+        self._writing = False
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._start()
+
+    def _start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    # Queue changed rows (a Date/Score/Hours frame); returns the rows queued.
+    # queued is the caller's own record of what it queued (date -> row, kept
+    # per session): rows it already queued with the same value are skipped,
+    # so a rerun re-sending a session's old edits can't overwrite a newer
+    # save from another session.
+    def queue(self, changes, queued=None):
+        rows = [tuple(row) for row in changes[COLUMNS].astype({"Hours": str}).itertuples(index=False)]
+        queued = {} if queued is None else queued
+        count = 0
+        with self._cond:
+            for row in rows:
+                if queued.get(row[0]) == row:
+                    continue
+                if row[0] in self._pending:
+                    self.stats['coalesced'] += 1
+                self._pending[row[0]] = queued[row[0]] = row
+                count += 1
+            if count:
+                now = time.monotonic()
+                self._first = self._first or now
+                self._last = now
+                self.stats['queued'] += count
+                self._cond.notify()
+                # A session still holding a closed saver gets its thread back
+                # until the rows are written
+                if not self._running:
+                    self._start()
+        return count
+
+    @property
+    def unsaved(self):
+        with self._cond:
+            return len(self._pending) + self._in_flight
+
+    def _due(self):
+        now = time.monotonic()
+        return min(self._last + self.delay, self._first + self.max_wait) - now
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    if self._closed:
+                        self._running = False
+                        return
+                    self._cond.wait()
+                wait = self._due()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+            self._write()
+
+    # Take everything queued and save it in one call; on failure the rows go
+    # back in the queue unless a newer value for the date arrived meanwhile.
+    # Returns whether the save succeeded (None when there was nothing to take).
+    def _write(self):
+        with self._cond:
+            if self._writing or not self._pending:
+                return None
+            batch, self._pending = self._pending, {}
+            self._first = self._last = None
+            self._writing = True
+            self._in_flight = len(batch)
+        try:
+            self.storage.save_changes(pd.DataFrame(list(batch.values()), columns=COLUMNS))
+            self.last_error = None
+            with self._cond:
+                self.stats['flushes'] += 1
+                self.stats['rows_written'] += len(batch)
+            return True
+        except Exception as e:
+            self.last_error = e
+            with self._cond:
+                for date, row in batch.items():
+                    self._pending.setdefault(date, row)
+                now = time.monotonic()
+                self._first, self._last = now, now
+            return False
+        finally:
+            with self._cond:
+                self._writing = False
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    # Write whatever is queued now and wait until it is on disk, including a
+    # batch the worker took meanwhile. Returns whether everything was saved;
+    # gives up at the timeout or when a save fails.
+    def flush(self, timeout=30):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while self._writing and time.monotonic() < deadline:
+                    self._cond.wait(deadline - time.monotonic())
+                if not self._pending or time.monotonic() >= deadline:
+                    return not self._writing and not self._pending
+            if self._write() is False:
+                return False
+
+    # Save what is queued and stop the worker; returns whether it all saved
+    def close(self, timeout=30):
+        saved = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return saved
+
+
+# One line for the app: saved, saving, or retrying after an error
+def status_text(saver):
+    unsaved = saver.unsaved
+    if saver.last_error is not None:
+        return f"Autosave failed ({saver.last_error}); retrying {unsaved} day(s)"
+    return f"Saving changes to {unsaved} day(s)…" if unsaved else "All changes saved"
+
+
+_savers = {}
+_savers_lock = threading.Lock()
+
+
+# One saver per storage backend, shared by every session using it
+def get_autosaver(storage, delay=DEBOUNCE_SECONDS):
+    with _savers_lock:
+        saver = _savers.get(id(storage))
+        if saver is None or saver.storage is not storage:
+            saver = _savers[id(storage)] = AutoSaver(storage, delay)
+        return saver
+
+
+# Flush and stop the saver of a storage backend that is no longer used
+def release_autosaver(storage):
+    with _savers_lock:
+        saver = _savers.get(id(storage))
+        if saver is None or saver.storage is not storage:
+            return
+        del _savers[id(storage)]
+    saver.close()
+
+
+@atexit.register
+def flush_all():
+    for saver in list(_savers.values()):
+        saver.flush()
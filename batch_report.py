@@ -0,0 +1,128 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from archive import Archive, open_archive
+from edits import parse_hours, score_from_hours
+from forecast import HORIZON, forecast_table
+from gap_fill import fill_missing_dates, midwest_today
+from model import EPOCH_ORDINAL, day_number, to_day_numbers
+from trend import TrendAccumulator
+
+# Headless version of the exercise_app.py pipeline for a directory of logs in
+# the exercise_data.csv format (Date, Score, Hours), one file per user, or
+# for every user of a binary archive (archive.py), which each worker maps
+# instead of parsing CSV.
+# Each file is processed in a worker process; the summary table and one PNG
+# per user are written to the output directory. The workers hand back each
+# user's scored days, and the trend model selection and forecast for all
+# users is then solved in batches (forecast.py) rather than one user at a time.
+# Usage: python batch_report.py LOG_DIR_OR_ARCHIVE OUT_DIR [--workers N] [--no-charts]
+#            [--horizon 30] [--no-forecast]
+
+
+# A job's calendar through today: the toordinal() day numbers and hours (0 when
+# blank) of the recorded days, and the number of days in the calendar. Archive
+# users are read straight from the mapped arrays, which hold only recorded
+# days, so nothing is formatted as text or parsed back.
+def read_days(source, today):
+    if isinstance(source, tuple):
+        day, hours, _ = open_archive(source[0]).slice(source[1])
+        ordinals = day.astype(np.int64) + EPOCH_ORDINAL
+        today = day_number(today) + EPOCH_ORDINAL
+        first = min(int(ordinals[0]), today) if len(day) else today
+        last = max(int(ordinals[-1]), today) if len(day) else today
+        return ordinals, np.nan_to_num(np.round(hours.astype(np.float64), 4)), last - first + 1
+    df = fill_missing_dates(pd.read_csv(source), today=today)
+    return to_day_numbers(df["Date"]).astype(np.int64) + EPOCH_ORDINAL, parse_hours(df["Hours"]), len(df)
+
+
+def report_user(source, out_dir, today, charts=True):
+    start = time.perf_counter()
+    user = source[1] if isinstance(source, tuple) else Path(source).stem
+    row = {"user": user, "file": ":".join(map(str, source)) if isinstance(source, tuple) else str(source)}
+    series = None
+    try:
+        ordinals, hours, days = read_days(source, today)
+        scores = score_from_hours(hours)
+        active = scores > 0
+        ordinals, scores = ordinals[active], scores[active]
+
+        row.update({
+            "days": days,
+            "active_days": len(scores),
+            "total_hours": float(hours.sum()),
+            "mean_score": float(scores.mean()) if len(scores) else 0.0,
+        })
+        if len(scores) > 1:
+            trend = TrendAccumulator.from_series(ordinals, scores)
+            linear_fit, poly_fit = trend.linear(), trend.quadratic()
+            row.update({
+                "slope_per_day": float(linear_fit.coef[1]),
+                "r2_linear": linear_fit.r2,
+                "r2_poly": poly_fit.r2,
+            })
+            if charts:
+                from charts import render_trend_chart
+                chart_path = Path(out_dir) / f"{user}.png"
+                chart_path.write_bytes(render_trend_chart(ordinals, scores))
+                row["chart"] = str(chart_path)
+            series = ordinals.astype(float), scores.astype(float)
+        row["error"] = ""
+    except Exception as e:
+        row["error"] = repr(e)
+        series = None
+    row["seconds"] = time.perf_counter() - start
+    return row, series
+
+
+def _report_user(args):
+    return report_user(*args)
+
+
+def run_batch(log_dir, out_dir, workers=None, charts=True, today=None, horizon=HORIZON, forecast=True):
+    today = today or midwest_today()
+    os.makedirs(out_dir, exist_ok=True)
+    if os.path.isfile(log_dir):
+        sources = [(log_dir, user) for user in Archive(log_dir).names]
+    else:
+        sources = sorted(Path(log_dir).glob("*.csv"))
+    workers = workers or os.cpu_count()
+    jobs = [(source, out_dir, today, charts) for source in sources]
+    chunksize = max(1, len(jobs) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_report_user, jobs, chunksize=chunksize))
+    summary = pd.DataFrame([row for row, _ in results])
+    fitted = [(row["user"], series) for row, series in results if series is not None]
+    if forecast and fitted:
+        forecasts = forecast_table([s for _, s in fitted], [u for u, _ in fitted], horizon=horizon)
+        summary = summary.merge(forecasts, on="user", how="left")
+    summary.to_csv(Path(out_dir) / "summary.csv", index=False)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score, trend and chart every exercise log in a directory")
+    parser.add_argument("log_dir", help="directory of CSV logs, or an archive written by archive.py")
+    parser.add_argument("out_dir")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--no-charts", action="store_true", help="skip rendering the per-user PNGs")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="days to forecast")
+    parser.add_argument("--no-forecast", action="store_true", help="skip trend model selection and forecasts")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = run_batch(args.log_dir, args.out_dir, args.workers, not args.no_charts,
+                        horizon=args.horizon, forecast=not args.no_forecast)
+    elapsed = time.perf_counter() - start
+    failed = (summary["error"] != "").sum() if len(summary) else 0
+    print(f"{len(summary)} logs in {elapsed:.2f}s ({len(summary) / elapsed:.1f} logs/s), {failed} failed")
+    if len(summary):
+        print(f"per-file seconds: mean {summary['seconds'].mean():.4f}, max {summary['seconds'].max():.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from archive import Archive, csv_logs, write_archive
+from model import DayLog
+
+# Loading many users' histories from one CSV per user against one archive
+# (archive.py): every user's full log as a DayLog, then a 60-day window per
+# user. Reports seconds, the bytes on disk and the peak memory allocated
+# while loading (tracemalloc). Each synthetic user logs about 70% of days.
+# Usage: python bench_archive.py [--users 1000] [--years 5]
+
+TODAY = "2025-01-01"
+
+
+def write_csvs(directory, users, days, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=TODAY, periods=days, freq="D").strftime("%Y-%m-%d")
+    for u in range(users):
+        keep = rng.random(days) < 0.7
+        hours = np.round(rng.uniform(0.1, 4, keep.sum()), 1)
+        pd.DataFrame({"Date": dates[keep], "Score": np.round(hours / 3, 2), "Hours": hours}).to_csv(
+            os.path.join(directory, f"user{u}.csv"), index=False)
+    return dates
+
+
+# Seconds of one run, and the peak allocation of a second, traced run
+# (tracing slows pandas down too much to time the same run)
+def measure(fn):
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--years", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_dir = os.path.join(tmp, "logs")
+        os.makedirs(csv_dir)
+        dates = write_csvs(csv_dir, args.users, args.years * 365)
+        paths = [os.path.join(csv_dir, f"user{u}.csv") for u in range(args.users)]
+        archive_path = os.path.join(tmp, "history.exa")
+        start = time.perf_counter()
+        write_archive(archive_path, csv_logs([csv_dir]))
+        packed = time.perf_counter() - start
+        csv_bytes = sum(os.path.getsize(p) for p in paths)
+        print(f"{args.users:,} users x {args.years} years: CSV {csv_bytes / 1e6:.1f} MB, "
+              f"archive {os.path.getsize(archive_path) / 1e6:.1f} MB (packed in {packed:.1f}s)")
+
+        window = (dates[-400], dates[-340])
+        runs = {
+            "full logs, CSV": lambda: [DayLog.from_raw(pd.read_csv(p), TODAY) for p in paths],
+            "full logs, archive": lambda: [a.day_log(u, TODAY) for a in [Archive(archive_path)] for u in a.names],
+            "60-day window, CSV": lambda: [df[(df["Date"] >= window[0]) & (df["Date"] <= window[1])]
+                                           for df in map(pd.read_csv, paths)],
+            "60-day window, archive": lambda: [a.slice(u, *window) for a in [Archive(archive_path)] for u in a.names],
+        }
+        for name, run in runs.items():
+            seconds, peak = measure(run)
+            print(f"{name:>24}: {seconds:7.3f}s  peak {peak / 1e6:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import time
+import numpy as np
+from forecast import FOLDS, MAX_DEGREE, forecast_table, select_trends
+
+# Trend model selection for many users: forecast_table() (batched solves)
+# against fitting each user's log on its own, as a per-user job would.
+# Each synthetic user has --days days of which about 70% have a score.
+# Usage: python bench_forecast.py [--users 5000] [--days 730] [--loop-users 500]
+
+
+def synthetic_series(users, days, seed=0):
+    rng = np.random.default_rng(seed)
+    start = 738000
+    series = []
+    for u in range(users):
+        day = np.flatnonzero(rng.random(days) < 0.7) + start
+        t = (day - day.mean()) / days
+        scores = np.abs(1.0 + rng.normal(0, 0.5) * t + rng.normal(0, 0.5) * t ** 2 + rng.normal(0, 0.3, len(day)))
+        series.append((day.astype(float), np.round(scores, 2)))
+    return series
+
+
+# The same cross-validated selection with one np.polyfit call per user,
+# fold and degree
+def polyfit_loop(series, max_degree=MAX_DEGREE, folds=FOLDS):
+    degrees = []
+    for days, scores in series:
+        x = (days - days.mean()) / max(np.ptp(days) / 2, 1.0)
+        cuts = len(days) * np.arange(1, folds + 2) // (folds + 1)
+        errors = []
+        for degree in range(1, max_degree + 1):
+            sse = count = 0.0
+            for f in range(folds):
+                coef = np.polyfit(x[:cuts[f]], scores[:cuts[f]], degree)
+                err = np.polyval(coef, x[cuts[f]:cuts[f + 1]]) - scores[cuts[f]:cuts[f + 1]]
+                sse += err @ err
+                count += len(err)
+            errors.append(sse / count)
+        degrees.append(int(np.argmin(errors)) + 1)
+    return degrees
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--loop-users", type=int, default=500, help="users timed with the per-user loops")
+    args = parser.parse_args()
+
+    series = synthetic_series(args.users, args.days)
+    names = [f"user{u}" for u in range(args.users)]
+    start = time.perf_counter()
+    table = forecast_table(series, names)
+    batched = time.perf_counter() - start
+
+    sample = series[:args.loop_users]
+    start = time.perf_counter()
+    for s in sample:
+        select_trends([s])
+    one_by_one = (time.perf_counter() - start) * args.users / len(sample)
+    start = time.perf_counter()
+    polyfit_loop(sample)
+    polyfit = (time.perf_counter() - start) * args.users / len(sample)
+
+    print(f"{args.users:,} users x {args.days} days, degrees 1-{MAX_DEGREE}, {FOLDS} folds")
+    print(f"  batched:             {batched:7.2f}s")
+    print(f"  one user at a time:  {one_by_one:7.2f}s (extrapolated from {len(sample)} users)")
+    print(f"  np.polyfit per fit:  {polyfit:7.2f}s (extrapolated from {len(sample)} users)")
+    print("chosen degrees:", table["degree"].value_counts().sort_index().to_dict())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from gap_fill import fill_missing_dates
+
+# Benchmark the calendar gap fill from 100 to 1,000,000 days.
+# Every other day is logged, so half of the calendar has to be filled in.
+# Usage: python bench_gap_fill.py [--with-loop]
+
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+LOOP_LIMIT = 10_000  # the old per-date concat loop is quadratic, don't go past this
+
+
+def make_log(n_days, today):
+    dates = pd.date_range(end=today, periods=n_days, freq='D')[::2]
+    hours = np.round(np.random.default_rng(0).uniform(0, 4, len(dates)), 1)
+    return pd.DataFrame({'Date': dates.strftime('%Y-%m-%d'), 'Score': np.round(hours / 3, 2), 'Hours': hours})
+
+
+# The loader this replaces, kept here for comparison
+def concat_loop_fill(df, today):
+    df = df.copy()
+    df['Date'] = pd.to_datetime(df['Date'])
+    all_dates = pd.date_range(df['Date'].min(), today, freq='D')
+    missing_dates = all_dates.difference(df['Date'])
+    for d in missing_dates:
+        df = pd.concat([df, pd.DataFrame([{'Date': d, 'Score': 0, 'Hours': ''}])], ignore_index=True)
+    df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
+    return df
+
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    with_loop = '--with-loop' in sys.argv
+    # 1,000,000 days is ~2,700 years, so end the synthetic logs far enough out
+    today = pd.Timestamp('4000-01-01')
+    print(f"{'days':>10} {'reindex (s)':>12} {'us/day':>8}" + (f" {'concat loop (s)':>16}" if with_loop else ''))
+    for n in SIZES:
+        log = make_log(n, today)
+        t = best_of(lambda: fill_missing_dates(log, today=today))
+        line = f"{n:>10} {t:>12.4f} {t / n * 1e6:>8.3f}"
+        if with_loop and n <= LOOP_LIMIT:
+            line += f" {best_of(lambda: concat_loop_fill(log, today), repeat=1):>16.4f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
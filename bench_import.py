@@ -0,0 +1,67 @@
+import argparse
+import os
+import resource
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from bulk_import import import_export
+from storage import AppendLogStorage
+
+# Benchmark of the streaming importer on a synthetic minute-level export:
+# ROWS one-minute records (timestamp with a UTC offset, duration in seconds)
+# spread over the days before END_DATE, imported into an empty append-log store.
+# Reports rows/s and the process's peak RSS, which depends on --chunksize
+# rather than --rows.
+# Usage: python bench_import.py [--rows 10000000] [--chunksize 1000000] [--json]
+
+END_DATE = pd.Timestamp("2025-01-01", tz="UTC")
+WRITE_ROWS = 1_000_000
+
+
+def write_export(path, rows, json=False, seed=0):
+    rng = np.random.default_rng(seed)
+    with open(path, "w") as f:
+        for lo in range(0, rows, WRITE_ROWS):
+            # About four hours of activity a day, one record per active minute
+            minutes = (np.arange(lo, min(lo + WRITE_ROWS, rows), dtype=np.int64) - rows) * 6
+            ts = END_DATE + pd.to_timedelta(minutes, unit="min")
+            chunk = pd.DataFrame({
+                "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+                "duration": rng.integers(30, 61, len(ts)),
+            })
+            if json:
+                chunk.to_json(f, orient="records", lines=True)
+            else:
+                chunk.to_csv(f, index=False, header=lo == 0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    parser.add_argument("--json", action="store_true", help="JSON Lines export instead of CSV")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = os.path.join(tmp, "export.jsonl" if args.json else "export.csv")
+        start = time.perf_counter()
+        write_export(export, args.rows, args.json)
+        size_mb = os.path.getsize(export) / 1e6
+        print(f"wrote {args.rows:,} rows ({size_mb:.0f} MB) in {time.perf_counter() - start:.1f}s")
+        written_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        storage = AppendLogStorage(os.path.join(tmp, "exercise_data.csv"))
+        result = import_export(export, storage, chunksize=args.chunksize,
+                               progress=lambda rows, s: print(f"  {rows:,} rows, {rows / s:,.0f} rows/s", flush=True))
+        again = import_export(export, storage, chunksize=args.chunksize)
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"import: {result['rows']:,} rows -> {result['days']:,} days in {result['seconds']:.1f}s "
+          f"({result['rows_per_second']:,.0f} rows/s), {result['changed_days']:,} days saved")
+    print(f"re-import: {again['changed_days']:,} days changed in {again['seconds']:.1f}s")
+    print(f"peak RSS {written_mb:.0f} MB after writing the export, {peak_mb:.0f} MB after importing it")
+
+
+if __name__ == "__main__":
+    main()
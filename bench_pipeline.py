@@ -0,0 +1,117 @@
+import argparse
+import io
+import json
+import platform
+import subprocess
+import time
+import numpy as np
+import pandas as pd
+from edits import apply_editor_edits, parse_hours, score_from_hours
+from gap_fill import fill_missing_dates
+from model import EPOCH_ORDINAL, to_day_numbers
+from trend import TrendAccumulator
+
+# Stage-by-stage benchmark of the app pipeline on synthetic logs in the
+# exercise_data.csv schema: CSV read, date parsing (formerly the UTC ->
+# Midwest tz conversion), missing-date fill, edit application, score
+# recomputation, both regressions and chart rendering.
+# Results go to a JSON file; pass --compare with an earlier file to see ratios.
+# Usage: python bench_pipeline.py [--out bench_pipeline.json] [--compare old.json] [--quick]
+
+SIZES = [30, 365, 3_650, 100_000, 1_000_000]
+DENSITIES = {"dense": 1.0, "sparse": 0.1}
+END_DATE = pd.Timestamp("4000-01-01")  # far enough out for 1,000,000 days of history
+EDITS = 10
+
+
+def synthetic_csv(days, density, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=END_DATE, periods=days, freq="D", unit="s")
+    keep = rng.random(days) < density
+    keep[-1] = True
+    hours = np.round(rng.uniform(0.1, 4, keep.sum()), 1)
+    df = pd.DataFrame({"Date": dates[keep].strftime("%Y-%m-%d"), "Score": np.round(hours / 3, 2), "Hours": hours})
+    return df.to_csv(index=False)
+
+
+def timed(stages, name, fn):
+    start = time.perf_counter()
+    result = fn()
+    stages[name] = stages.get(name, 0.0) + time.perf_counter() - start
+    return result
+
+
+def run_pipeline(csv_text, stages, max_chart_days):
+    raw = timed(stages, "csv_read", lambda: pd.read_csv(io.StringIO(csv_text)))
+    timed(stages, "date_parse", lambda: pd.to_datetime(raw["Date"], format="ISO8601"))
+    df = timed(stages, "gap_fill", lambda: fill_missing_dates(raw, today=END_DATE))
+    df["Hours"] = df["Hours"].astype(str)
+
+    rng = np.random.default_rng(1)
+    positions = rng.choice(len(df), min(EDITS, len(df)), replace=False)
+    edit_state = {"edited_rows": {int(p): {"Hours": "2.5"} for p in positions}, "added_rows": [], "deleted_rows": []}
+    df, _ = timed(stages, "edit_apply", lambda: apply_editor_edits(df, edit_state))
+    scores = timed(stages, "score_recompute", lambda: score_from_hours(parse_hours(df["Hours"])))
+
+    days = to_day_numbers(df["Date"]).astype(np.int64) + EPOCH_ORDINAL
+    active = scores > 0
+
+    def fits():
+        trend = TrendAccumulator.from_series(days[active], scores[active])
+        return trend.linear(), trend.quadratic()
+    timed(stages, "regressions", fits)
+
+    if len(df) <= max_chart_days:
+        from charts import clear_chart_cache, render_trend_chart
+        clear_chart_cache()
+        timed(stages, "chart_render", lambda: render_trend_chart(days[active], scores[active]))
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default="bench_pipeline.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--users", type=int, default=1000, help="logs in the many-users scenario")
+    parser.add_argument("--max-chart-days", type=int, default=1_000_000, help="skip chart rendering above this size")
+    parser.add_argument("--quick", action="store_true", help="only sizes up to 3,650 days and 100 users")
+    args = parser.parse_args()
+
+    sizes = [s for s in SIZES if not args.quick or s <= 3_650]
+    users = 100 if args.quick else args.users
+    scenarios = [(f"{density}-{days}", days, density, 1) for days in sizes for density in DENSITIES]
+    scenarios.append((f"users-{users}x365", 365, "dense", users))
+
+    results = []
+    for name, days, density, n_users in scenarios:
+        texts = [synthetic_csv(days, DENSITIES[density], seed) for seed in range(n_users)]
+        stages = {}
+        for text in texts:
+            run_pipeline(text, stages, args.max_chart_days)
+        results.append({"scenario": name, "days": days, "density": density, "users": n_users,
+                        "stages": {k: round(v, 6) for k, v in stages.items()}})
+        print(f"{name:>18}: " + "  ".join(f"{k} {v * 1000:.1f}ms" for k, v in stages.items()))
+
+    report = {"commit": git_commit(), "python": platform.python_version(), "pandas": pd.__version__,
+              "numpy": np.__version__, "results": results}
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {r["scenario"]: r["stages"] for r in json.load(f)["results"]}
+        print(f"\nratio vs {args.compare} (new / old):")
+        for r in results:
+            old = baseline.get(r["scenario"], {})
+            print(f"{r['scenario']:>18}: " + "  ".join(
+                f"{k} {v / old[k]:.2f}x" for k, v in r["stages"].items() if old.get(k)))
+
+
+if __name__ == "__main__":
+    main()
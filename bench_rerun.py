@@ -0,0 +1,109 @@
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import warnings
+from gap_fill import midwest_today
+from profiling import section_seconds
+
+# Rerun latency of exercise_app.py per interaction, before and after the page
+# was split into fragments. Streamlit's AppTest always reruns the whole script,
+# so "before" is the wall time of that full rerun and "after" is the time spent
+# in the sections a fragment rerun executes (from the app's phase timings):
+#   edit   - an Hours edit reruns the log section (editor, summary, chart);
+#            the chart is redrawn because the scores changed
+#   page   - "Older"/"Newer" reruns the log section with the chart cached
+#   avatar - "Show Larger Image" reruns only the avatar section
+# The app runs in a temporary directory on a copy of the logs, so the edits
+# (which are autosaved) don't touch the real data.
+# Usage: python bench_rerun.py [--edits 10] [--plot rerun_latency.png]
+
+APP = os.path.abspath("exercise_app.py")
+DATA_FILES = ["exercise_data.csv", "daily_data.csv"]
+
+
+def measure(at, action, section):
+    action(at)
+    start = time.perf_counter()
+    at.run()
+    full = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return full, section_seconds(at.session_state["rerun_history"][-1], section)
+
+
+def plot(results, path):
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    names = list(results)
+    before = [results[n][0] * 1000 for n in names]
+    after = [results[n][1] * 1000 for n in names]
+    x = range(len(names))
+    ax.bar([i - 0.2 for i in x], before, width=0.4, label="full rerun (before)")
+    ax.bar([i + 0.2 for i in x], after, width=0.4, label="fragment rerun (after)")
+    ax.set_xticks(list(x), names)
+    ax.set_ylabel("median rerun latency (ms)")
+    ax.set_title("Rerun latency per interaction")
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edits", type=int, default=10, help="interactions of each kind")
+    parser.add_argument("--plot", help="write a bar chart of the medians to this PNG")
+    args = parser.parse_args()
+
+    if args.plot:
+        args.plot = os.path.abspath(args.plot)
+    workdir = tempfile.mkdtemp()
+    for name in DATA_FILES:
+        if os.path.exists(name):
+            shutil.copy(name, workdir)
+    os.chdir(workdir)
+
+    warnings.filterwarnings("ignore")
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=120).run()  # warm caches and imports
+    today = midwest_today().strftime("%Y-%m-%d")
+
+    def edit(i):
+        # Pending edits are what the windowed editor hands to the log section
+        def action(at):
+            at.session_state["pending_edits"] = {today: f"{1 + i % 5}"}
+        return action
+
+    def turn_page(i):
+        def action(at):
+            label = "◀ Older" if i % 2 == 0 else "Newer ▶"
+            next(b for b in at.button if b.label == label).click()
+        return action
+
+    def show_avatar(at):
+        next(b for b in at.button if b.label == "Show Larger Image").click()
+
+    samples = {
+        "edit": [measure(at, edit(i), "log") for i in range(args.edits)],
+        "page": [measure(at, turn_page(i), "log") for i in range(args.edits)],
+        "avatar": [measure(at, show_avatar, "avatar") for _ in range(args.edits)],
+    }
+    results = {}
+    for name, runs in samples.items():
+        before = statistics.median(r[0] for r in runs)
+        after = statistics.median(r[1] for r in runs)
+        results[name] = (before, after)
+        print(f"{name:>7}: full rerun {before * 1000:7.1f} ms   fragment {after * 1000:7.1f} ms   "
+              f"({before / max(after, 1e-9):.1f}x)")
+    if args.plot:
+        plot(results, args.plot)
+        print(f"wrote {args.plot}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from storage import SqliteStorage
+
+# Leaderboard and period-summary latency from the rollup totals against
+# aggregating exercise_log on every request, for --users users with --history
+# days each in one SQLite database. Also times a 3-day save, which now
+# updates the rollups in the same transaction.
+# Usage: python bench_rollups.py [--users 1000] [--history 730] [--repeat 20]
+
+SCAN_LEADERBOARD = (
+    "SELECT user, count(*), sum(CAST(hours AS REAL)) AS total, sum(score) FROM exercise_log"
+    " WHERE date >= ? AND date <= ? GROUP BY user ORDER BY total DESC LIMIT 10"
+)
+SCAN_SUMMARY = (
+    "SELECT substr(date, 1, 7) AS month, count(*), sum(CAST(hours AS REAL)), sum(score)"
+    " FROM exercise_log GROUP BY month ORDER BY month"
+)
+
+
+def seed(db_path, users, history_days):
+    dates = pd.date_range(end="2025-01-01", periods=history_days, freq="D").strftime("%Y-%m-%d")
+    rng = np.random.default_rng(0)
+    for user in users:
+        hours = np.round(rng.uniform(0.1, 4, history_days), 1)
+        SqliteStorage("exercise_data.csv", user, db_path).save_changes(
+            pd.DataFrame({"Date": dates, "Score": np.round(hours / 3, 2), "Hours": hours.astype(str)}))
+    return dates
+
+
+def timed(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--history", type=int, default=730, help="days of history per user")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "exercise_data.db")
+        start = time.perf_counter()
+        dates = seed(db_path, [f"user{i}" for i in range(args.users)], args.history)
+        print(f"seeded {args.users:,} users x {args.history} days in {time.perf_counter() - start:.1f}s")
+
+        storage = SqliteStorage("exercise_data.csv", "user0", db_path)
+        conn = sqlite3.connect(db_path)
+        month = dates[-1][:7]
+        results = {
+            "leaderboard, rollups": timed(lambda: storage.leaderboard("month", month), args.repeat),
+            "leaderboard, scan": timed(lambda: conn.execute(SCAN_LEADERBOARD, (f"{month}-01", f"{month}-31")).fetchall(),
+                                       args.repeat),
+            "monthly summary, rollups": timed(lambda: storage.period_summary("month", everyone=True), args.repeat),
+            "monthly summary, scan": timed(lambda: conn.execute(SCAN_SUMMARY).fetchall(), args.repeat),
+        }
+        rng = np.random.default_rng(1)
+
+        def save():
+            edited = rng.choice(dates, 3, replace=False)
+            hours = np.round(rng.uniform(0.1, 4, 3), 1)
+            storage.save_changes(pd.DataFrame({"Date": edited, "Score": np.round(hours / 3, 2),
+                                               "Hours": hours.astype(str)}))
+        results["3-day save"] = timed(save, args.repeat)
+        conn.close()
+
+    for name, seconds in results.items():
+        print(f"{name:>25}: {seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
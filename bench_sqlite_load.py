@@ -0,0 +1,78 @@
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import numpy as np
+import pandas as pd
+from storage import SqliteStorage
+
+# Load test for the SQLite backend: each simulated session saves a few edited
+# days and reads back a 60-day window, as a rerun after Save would.
+# Usage: python bench_sqlite_load.py [--sessions 48] [--iterations 50] [--history 1000]
+
+
+def seed(db_path, users, history_days):
+    dates = pd.date_range(end='2025-01-01', periods=history_days, freq='D').strftime('%Y-%m-%d')
+    for user in users:
+        hours = np.round(np.random.default_rng(len(user)).uniform(0.1, 4, history_days), 1)
+        SqliteStorage("exercise_data.csv", user, db_path).save_changes(
+            pd.DataFrame({'Date': dates, 'Score': np.round(hours / 3, 2), 'Hours': hours.astype(str)}))
+    return list(dates)
+
+
+def session(db_path, user, dates, iterations, timings, errors):
+    storage = SqliteStorage("exercise_data.csv", user, db_path)
+    rng = random.Random(user)
+    for _ in range(iterations):
+        try:
+            start = time.perf_counter()
+            edited = rng.sample(dates, 3)
+            hours = [round(rng.uniform(0.1, 4), 1) for _ in edited]
+            storage.save_changes(pd.DataFrame({'Date': edited, 'Score': [round(h / 3, 2) for h in hours],
+                                               'Hours': [str(h) for h in hours]}))
+            saved = time.perf_counter()
+            end = rng.randrange(60, len(dates))
+            window = storage.load_range(dates[end - 60], dates[end])
+            assert len(window) == 61
+            timings.append((saved - start, time.perf_counter() - saved))
+        except Exception as e:
+            errors.append(repr(e))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=48)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--history", type=int, default=1000, help="days of history per user")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "exercise_data.db")
+        users = [f"user{i}" for i in range(args.sessions)]
+        dates = seed(db_path, users, args.history)
+
+        timings, errors = [], []
+        threads = [threading.Thread(target=session, args=(db_path, u, dates, args.iterations, timings, errors))
+                   for u in users]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+    saves = np.array([t[0] for t in timings]) * 1000
+    reads = np.array([t[1] for t in timings]) * 1000
+    print(f"{args.sessions} sessions x {args.iterations} save+read rounds in {elapsed:.2f}s "
+          f"({len(timings) / elapsed:.0f} rounds/s), {len(errors)} errors")
+    print(f"save ms: p50 {np.percentile(saves, 50):.2f}  p95 {np.percentile(saves, 95):.2f}")
+    print(f"read ms: p50 {np.percentile(reads, 50):.2f}  p95 {np.percentile(reads, 95):.2f}")
+    if errors:
+        print(errors[:5])
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
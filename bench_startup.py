@@ -0,0 +1,58 @@
+import argparse
+import json
+import subprocess
+import sys
+
+# Cold-start benchmark: time from interpreter start until the app first calls
+# st.data_editor, measured in a fresh process so nothing is already imported.
+# Fails (exit code 1) when the time goes over the budget, or when the plotting
+# stack was imported before the table was shown.
+# Usage: python bench_startup.py [--app exercise_app.py] [--budget 3.0]
+
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+first_table = {}
+data_editor = streamlit.data_editor
+def timed_data_editor(*args, **kwargs):
+    if not first_table:
+        first_table["seconds"] = time.perf_counter() - start
+        first_table["plotting_loaded"] = "matplotlib.pyplot" in sys.modules
+    return data_editor(*args, **kwargs)
+streamlit.data_editor = timed_data_editor
+
+AppTest.from_file(sys.argv[1], default_timeout=120).run()
+first_table["total_seconds"] = time.perf_counter() - start
+print(json.dumps(first_table))
+"""
+
+
+def measure(app):
+    result = subprocess.run([sys.executable, "-c", CHILD, app], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="exercise_app.py")
+    parser.add_argument("--budget", type=float, default=3.0, help="seconds to first table")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    runs = [measure(args.app) for _ in range(args.runs)]
+    best = min(runs, key=lambda r: r["seconds"])
+    print(f"{args.app}: first table after {best['seconds']:.3f}s "
+          f"(full run {best['total_seconds']:.3f}s, budget {args.budget:.3f}s)")
+    if best["plotting_loaded"]:
+        print("FAIL: matplotlib was imported before the table was shown")
+        sys.exit(1)
+    if best["seconds"] > args.budget:
+        print("FAIL: time to first table is over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
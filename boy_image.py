@@ -1,10 +1,46 @@
+import io
+from functools import lru_cache
 from PIL import Image, ImageDraw
 
-def create_boy_image():
+# The figure is laid out on a 400x600 canvas
+BASE_WIDTH, BASE_HEIGHT = 400, 600
+
+
+# Draws on the output image using the coordinates of the base canvas,
+# so the figure is rendered directly at the requested size
+class ScaledDraw:
+    def __init__(self, draw, sx, sy):
+        self.draw = draw
+        self.sx = sx
+        self.sy = sy
+
+    def _points(self, points):
+        return [(x * self.sx, y * self.sy) for x, y in points]
+
+    def _width(self, width):
+        return max(1, round(width * min(self.sx, self.sy)))
+
+    def ellipse(self, xy, **kwargs):
+        self.draw.ellipse(self._points(xy), **kwargs)
+
+    def rectangle(self, xy, **kwargs):
+        self.draw.rectangle(self._points(xy), **kwargs)
+
+    def polygon(self, xy, **kwargs):
+        self.draw.polygon(self._points(xy), **kwargs)
+
+    def line(self, xy, width=1, **kwargs):
+        self.draw.line(self._points(xy), width=self._width(width), **kwargs)
+
+    def arc(self, xy, start, end, width=1, **kwargs):
+        self.draw.arc(self._points(xy), start, end, width=self._width(width), **kwargs)
+
+
+def create_boy_image(output_width=BASE_WIDTH, output_height=BASE_HEIGHT):
     # Create a blank image with a white background
-    width, height = 400, 600
-    image = Image.new('RGB', (width, height), 'white')
-    draw = ImageDraw.Draw(image)
+    width, height = BASE_WIDTH, BASE_HEIGHT
+    image = Image.new('RGB', (output_width, output_height), 'white')
+    draw = ScaledDraw(ImageDraw.Draw(image), output_width / width, output_height / height)
 
     # Draw the head (big circle)
     head_radius = 80
@@ -193,9 +229,12 @@ def create_boy_image():
         fill='black'
     )
 
-    # Resize the image to 1/10 of its original size
-    new_width = width #// 10
-    new_height = height #// 10
-    resized_image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    return image
+
 
-    return resized_image
+# Encoded PNG of the image at a given size; repeated sizes cost no PIL work
+@lru_cache(maxsize=8)
+def boy_image_png(output_width=BASE_WIDTH, output_height=BASE_HEIGHT):
+    buffer = io.BytesIO()
+    create_boy_image(output_width, output_height).save(buffer, format='PNG')
+    return buffer.getvalue()
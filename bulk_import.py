@@ -0,0 +1,164 @@
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+from edits import parse_hours, score_from_hours
+from gap_fill import midwest_tz
+from model import format_days
+from storage import get_storage
+
+# Bulk import of wearable/tracker exports (one record per minute or session)
+# into the daily Date/Score/Hours log. The export is read in fixed-size chunks
+# and each chunk is reduced to hours per day before the next is read, so
+# memory depends on the chunk size and the number of days, not the file size.
+# Only days whose hours change are passed to the storage backend.
+# Exports are CSV or JSON Lines (one JSON object per line). Timestamps with an
+# offset are converted to the Midwest time zone before taking the date;
+# naive ones are taken as local time (or UTC with --utc), and numbers as Unix
+# seconds.
+# Usage: python bulk_import.py EXPORT [--time-col timestamp] [--duration-col duration]
+#            [--unit s] [--add] [--storage csv] [--user NAME] [--dry-run]
+
+CHUNK_ROWS = 1_000_000
+# Duration units, in hours
+UNITS = {"s": 1 / 3600, "min": 1 / 60, "h": 1.0}
+
+
+def read_chunks(path, columns, chunksize=CHUNK_ROWS):
+    if path.endswith((".json", ".jsonl", ".ndjson")):
+        for chunk in pd.read_json(path, lines=True, chunksize=chunksize, dtype=False):
+            yield chunk[columns]
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+# Offsets in minutes of 'Z', '+HH:MM' and '+HHMM' suffixes (None for anything else)
+def _offset_minutes(suffix):
+    if suffix == "Z":
+        return 0
+    digits = suffix[1:].replace(":", "")
+    if suffix[:1] not in ("+", "-") or len(digits) != 4 or not digits.isdigit():
+        return None
+    return (1 if suffix[0] == "+" else -1) * (int(digits[:2]) * 60 + int(digits[2:]))
+
+
+# UTC times of 'YYYY-MM-DDTHH:MM:SS<offset>' strings, or None for other layouts.
+# Parsing an offset per row is the slowest part of an import, so the local
+# part is parsed without it and the few distinct offsets are applied by code.
+def _parse_with_offsets(text):
+    if not len(text) or text.str.len().nunique() != 1:
+        return None
+    codes, suffixes = pd.factorize(text.str.slice(19))
+    offsets = [_offset_minutes(s) for s in suffixes]
+    if None in offsets or (codes < 0).any():
+        return None
+    local = pd.to_datetime(text.str.slice(0, 19), format="ISO8601").to_numpy()
+    utc = local - np.array(offsets, dtype="timedelta64[m]")[codes]
+    return pd.Series(utc, index=text.index).dt.tz_localize("UTC")
+
+
+# Local calendar day numbers (days since 1970-01-01) of a column of timestamps
+def local_days(timestamps, utc=False):
+    if pd.api.types.is_numeric_dtype(timestamps):
+        ts = pd.to_datetime(timestamps, unit="s", utc=True)
+    else:
+        ts = _parse_with_offsets(timestamps.astype(str))
+    if ts is None:
+        try:
+            ts = pd.to_datetime(timestamps, format="ISO8601")
+        except ValueError:
+            # Mixed offsets (e.g. across a DST change) only parse as UTC
+            ts = pd.to_datetime(timestamps, format="ISO8601", utc=True)
+        if ts.dt.tz is None and utc:
+            ts = ts.dt.tz_localize("UTC")
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_convert(midwest_tz).dt.tz_localize(None)
+    return ts.to_numpy().astype("datetime64[D]").astype(np.int64)
+
+
+# Hours per day of one chunk, as a Series indexed by day number
+def daily_hours(chunk, time_col, duration_col, unit="s", utc=False):
+    days = local_days(chunk[time_col], utc)
+    hours = pd.to_numeric(chunk[duration_col], errors="coerce").to_numpy(dtype=float) * UNITS[unit]
+    keep = ~np.isnan(hours) & (days >= 0)
+    return pd.Series(hours[keep]).groupby(days[keep]).sum()
+
+
+# Hours per day over the whole export, streamed chunk by chunk. progress is
+# called after each chunk with (rows so far, seconds so far).
+def aggregate_export(path, time_col="timestamp", duration_col="duration", unit="s", utc=False,
+                     chunksize=CHUNK_ROWS, progress=None):
+    start = time.perf_counter()
+    totals = pd.Series(dtype=float)
+    rows = 0
+    for chunk in read_chunks(path, [time_col, duration_col], chunksize):
+        totals = totals.add(daily_hours(chunk, time_col, duration_col, unit, utc), fill_value=0.0)
+        rows += len(chunk)
+        if progress:
+            progress(rows, time.perf_counter() - start)
+    return totals.sort_index(), rows
+
+
+# The imported days whose hours differ from the log, as Date/Score/Hours rows.
+# With add=True the imported hours are added to what is logged already,
+# otherwise they replace it.
+def changed_days(storage, totals, add=False):
+    if not len(totals):
+        return pd.DataFrame(columns=["Date", "Score", "Hours"])
+    dates = format_days(totals.index.to_numpy())
+    existing = storage.load_range(dates[0], dates[-1]) if storage.exists() else pd.DataFrame(columns=["Date", "Hours"])
+    current = pd.Series(parse_hours(existing["Hours"]), index=existing["Date"].astype(str).to_numpy())
+    current = current[~current.index.duplicated(keep="last")].reindex(dates, fill_value=0.0).to_numpy()
+
+    hours = np.round(totals.to_numpy() + (current if add else 0.0), 2)
+    changed = np.abs(hours - current) > 1e-9
+    return pd.DataFrame({
+        "Date": dates[changed],
+        "Score": score_from_hours(hours[changed]),
+        "Hours": hours[changed].astype(str),
+    })
+
+
+def import_export(path, storage, time_col="timestamp", duration_col="duration", unit="s", utc=False,
+                  add=False, chunksize=CHUNK_ROWS, dry_run=False, progress=None):
+    start = time.perf_counter()
+    totals, rows = aggregate_export(path, time_col, duration_col, unit, utc, chunksize, progress)
+    changes = changed_days(storage, totals, add)
+    if not dry_run:
+        storage.save_changes(changes)
+    seconds = time.perf_counter() - start
+    return {"rows": rows, "days": len(totals), "changed_days": len(changes), "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds else 0.0}
+
+
+def print_progress(rows, seconds):
+    print(f"  {rows:,} rows in {seconds:.1f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a tracker export into the daily exercise log")
+    parser.add_argument("export", help="CSV or JSON Lines file, one record per minute/session")
+    parser.add_argument("--time-col", default="timestamp")
+    parser.add_argument("--duration-col", default="duration")
+    parser.add_argument("--unit", choices=UNITS, default="s", help="unit of the duration column")
+    parser.add_argument("--utc", action="store_true", help="timestamps without an offset are UTC")
+    parser.add_argument("--add", action="store_true", help="add to the logged hours instead of replacing them")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS, help="rows per chunk")
+    parser.add_argument("--file", default="exercise_data.csv", help="exercise log to import into")
+    parser.add_argument("--storage", choices=["csv", "append", "sqlite"],
+                        default=os.environ.get("EXERCISE_STORAGE", "csv"))
+    parser.add_argument("--user", default=None, help="user of the SQLite backend")
+    parser.add_argument("--dry-run", action="store_true", help="report the changes without saving")
+    args = parser.parse_args()
+
+    storage = get_storage(args.file, args.storage, user=args.user)
+    result = import_export(args.export, storage, args.time_col, args.duration_col, args.unit, args.utc,
+                           args.add, args.chunksize, args.dry_run, progress=print_progress)
+    print(f"{result['rows']:,} rows -> {result['days']:,} days, {result['changed_days']:,} changed"
+          f"{' (dry run)' if args.dry_run else ''} in {result['seconds']:.2f}s "
+          f"({result['rows_per_second']:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
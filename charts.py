@@ -0,0 +1,157 @@
+import io
+from collections import OrderedDict
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.dates as mdates
+import matplotlib.style
+from matplotlib.figure import Figure
+import seaborn as sns
+from downsample import lttb
+from fingerprint import data_fingerprint
+from model import EPOCH_ORDINAL
+from trend import TrendAccumulator
+
+# Rendered charts, keyed by (chart, data hash, options), least recently used first
+CHART_CACHE_SIZE = 32
+_chart_cache = OrderedDict()
+chart_cache_stats = {'hits': 0, 'misses': 0}
+
+THEMES = {"light": "default", "dark": "dark_background"}
+
+# Figure size in inches and pixels per inch
+FIGSIZE = (10, 6)
+DPI = 100
+# Actual scores drawn at most one per two pixels of figure width; longer
+# histories are downsampled with LTTB, which keeps peaks and dips
+MAX_POINTS = FIGSIZE[0] * DPI // 2
+# The fitted curves are smooth, so they are evaluated on a small fixed grid
+FIT_POINTS = 200
+# Room for one date label on the x axis
+LABEL_PIXELS = 80
+
+
+def _to_dates(days):
+    return (np.asarray(days, dtype=np.int64) - EPOCH_ORDINAL).astype("datetime64[D]")
+
+
+# Score chart with the actual points, linear fit and degree-2 polynomial fit.
+# days are toordinal() values, window an optional (first, last) ordinal pair.
+# The fits use every point, but the drawing is bounded by the figure's pixels
+# (max_points actual scores, FIT_POINTS per curve, a tick per LABEL_PIXELS), so
+# render time does not grow with the length of the history.
+# Figures are created without pyplot, so nothing is kept by a global figure
+# manager, and are always closed after rendering.
+def _render(days, scores, theme, fmt, max_points, fits=None):
+    if fits is None:
+        trend = TrendAccumulator.from_series(days, scores)
+        fits = trend.linear(), trend.quadratic()
+    linear_fit, poly_fit = fits
+    if max_points:
+        days, scores = lttb(days, scores, max_points)
+    grid = np.linspace(days[0], days[-1], FIT_POINTS) if len(days) else days
+    dates, grid_dates = _to_dates(days), _to_dates(grid)
+
+    with matplotlib.style.context(THEMES.get(theme, "default")):
+        fig = Figure(figsize=FIGSIZE, dpi=DPI)
+        try:
+            ax = fig.subplots()
+            # Scatter plot with dashed line connecting actual points
+            sns.scatterplot(x=dates, y=scores, ax=ax, color="blue", label="Actual Scores")
+            ax.plot(dates, scores, linestyle="dashed", color="blue", alpha=0.6)
+            # Linear regression line
+            ax.plot(grid_dates, linear_fit.predict(grid), color="red", label=f"Linear Fit (R²={linear_fit.r2:.3f})")
+            # Polynomial regression line
+            ax.plot(grid_dates, poly_fit.predict(grid), color="green", label=f"Polynomial Fit (R²={poly_fit.r2:.3f})")
+            # Grid lines
+            ax.grid(True, linestyle="--", alpha=0.6)  # Add dashed grid with transparency
+            ax.set_title("Score Analysis: Actual Data, Linear & Polynomial Regression")
+            ax.set_xlabel("Date")
+            ax.set_ylabel("Score")
+            ax.legend()
+
+            # Date labels spaced by the axis width rather than one per 7 days
+            ax.xaxis.set_major_locator(mdates.AutoDateLocator(maxticks=FIGSIZE[0] * DPI // LABEL_PIXELS))
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+            ax.tick_params(axis='x', rotation=45)
+            fig.tight_layout()
+
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt)
+        finally:
+            fig.clear()
+    data = buffer.getvalue()
+    return data.decode() if fmt == "svg" else data
+
+
+# PNG bytes (or SVG text) of the trend chart, rendered once per data/window/theme.
+# Pass max_points=None to draw every actual score, and fits to reuse a
+# (linear, quadratic) pair already fitted to these days and scores.
+def render_trend_chart(days, scores, window=None, theme="light", fmt="png", max_points=MAX_POINTS, fits=None):
+    days = np.asarray(days, dtype=np.int64)
+    scores = np.asarray(scores, dtype=float)
+    if window is not None:
+        keep = (days >= window[0]) & (days <= window[1])
+        days, scores = days[keep], scores[keep]
+        fits = None
+    if np.any(np.diff(days) < 0):
+        order = np.argsort(days, kind="stable")
+        days, scores = days[order], scores[order]
+
+    key = ("trend", data_fingerprint(days, scores), window, theme, fmt, max_points)
+    return _cached(key, lambda: _render(days, scores, theme, fmt, max_points, fits))
+
+
+def _cached(key, render):
+    if key in _chart_cache:
+        chart_cache_stats['hits'] += 1
+        _chart_cache.move_to_end(key)
+        return _chart_cache[key]
+
+    chart_cache_stats['misses'] += 1
+    chart = render()
+    _chart_cache[key] = chart
+    if len(_chart_cache) > CHART_CACHE_SIZE:
+        _chart_cache.popitem(last=False)
+    return chart
+
+
+# Stacked bars of score per period and activity (ActivityLog.breakdown)
+def _render_breakdown(table, theme, fmt):
+    with matplotlib.style.context(THEMES.get(theme, "default")):
+        fig = Figure(figsize=FIGSIZE, dpi=DPI)
+        try:
+            ax = fig.subplots()
+            bottom = np.zeros(len(table))
+            positions = np.arange(len(table))
+            for activity in table.columns:
+                values = table[activity].to_numpy(dtype=float)
+                ax.bar(positions, values, bottom=bottom, label=str(activity))
+                bottom += values
+            # One label per LABEL_PIXELS, however many periods there are
+            step = max(1, int(np.ceil(len(table) * LABEL_PIXELS / (FIGSIZE[0] * DPI))))
+            ax.set_xticks(positions[::step], table.index[::step], rotation=45)
+            ax.grid(True, axis="y", linestyle="--", alpha=0.6)
+            ax.set_title("Score by Activity")
+            ax.set_xlabel("Period")
+            ax.set_ylabel("Score")
+            if len(table.columns):
+                ax.legend(fontsize="small", ncol=max(1, len(table.columns) // 10))
+            fig.tight_layout()
+
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt)
+        finally:
+            fig.clear()
+    data = buffer.getvalue()
+    return data.decode() if fmt == "svg" else data
+
+
+def render_activity_chart(table, theme="light", fmt="png"):
+    # data_fingerprint leaves out the index, and the period labels are drawn
+    key = ("activities", data_fingerprint(table), tuple(map(str, table.index)), tuple(table.columns), theme, fmt)
+    return _cached(key, lambda: _render_breakdown(table, theme, fmt))
+
+
+def clear_chart_cache():
+    _chart_cache.clear()
@@ -0,0 +1,106 @@
+import io
+import os
+import numpy as np
+import pandas as pd
+from gap_fill import midwest_today
+from model import DayLog
+
+# Parsed logs cached by file identity (path, size, mtime, inode). Streamlit
+# keeps imported modules between reruns, so the cache lives as long as the server.
+_cache = {}
+cache_stats = {'hits': 0, 'misses': 0, 'appends': 0}
+
+# Bytes kept from the end of the parsed file to check that an append didn't touch them
+_TAIL_CHECK = 64
+
+
+def _identity(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+def _read_tail_check(f, size):
+    f.seek(max(size - _TAIL_CHECK, 0))
+    return f.read(min(size, _TAIL_CHECK))
+
+
+# Read the raw CSV. If the file only grew since the last read (same inode, the
+# old bytes are still there and ended on a newline), just the appended tail is
+# parsed. A rewrite through a temporary file gets a new inode, so it is always
+# read in full even when it grew and kept the old last bytes.
+def read_log(path):
+    size, mtime, ino = _identity(path)
+    entry = _cache.get(path)
+    if entry is not None and (entry['size'], entry['mtime'], entry['ino']) == (size, mtime, ino):
+        cache_stats['hits'] += 1
+        return entry
+
+    with open(path, 'rb') as f:
+        if (entry is not None and ino == entry['ino'] and size > entry['size'] and entry['tail'].endswith(b'\n')
+                and _read_tail_check(f, entry['size']) == entry['tail']):
+            f.seek(entry['size'])
+            new_rows = pd.read_csv(io.BytesIO(f.read(size - entry['size'])), header=None, names=list(entry['raw'].columns))
+            raw = pd.concat([entry['raw'], new_rows], ignore_index=True)
+            cache_stats['appends'] += 1
+        else:
+            f.seek(0)
+            raw = pd.read_csv(f)
+            cache_stats['misses'] += 1
+        tail = _read_tail_check(f, size)
+
+    entry = {'size': size, 'mtime': mtime, 'ino': ino, 'tail': tail, 'raw': raw, 'logs': {}, 'index': None}
+    _cache[path] = entry
+    return entry
+
+
+# Raw log as stored on disk (a copy, safe to modify)
+def load_raw_data(path):
+    return read_log(path)['raw'].copy()
+
+
+# A frame's rows sorted by Date, with the dates as a text array to search
+def date_index(raw):
+    dates = raw['Date'].astype(str).to_numpy(dtype=str)
+    if (dates[1:] < dates[:-1]).any():
+        order = np.argsort(dates, kind='stable')
+        raw, dates = raw.iloc[order].reset_index(drop=True), dates[order]
+    return raw, dates
+
+
+# Rows of a date index between two dates (inclusive, 'YYYY-MM-DD'); either
+# end may be open. Two binary searches, and only the rows in range are copied.
+def slice_index(index, start=None, end=None):
+    raw, dates = index
+    lo = np.searchsorted(dates, start or '0000-00-00', side='left')
+    hi = np.searchsorted(dates, end or '9999-99-99', side='right')
+    return raw.iloc[lo:max(lo, hi)].reset_index(drop=True)
+
+
+# Raw rows between two dates; the date index is built once per cache entry
+def load_raw_range(path, start=None, end=None):
+    entry = read_log(path)
+    if entry['index'] is None:
+        entry['index'] = date_index(entry['raw'])
+    return slice_index(entry['index'], start, end)
+
+
+# Typed DayLog of the complete calendar, cached per day, so reruns on an
+# unchanged file only copy it
+def load_day_log(path, today=None):
+    if today is None:
+        today = midwest_today()
+    entry = read_log(path)
+    log = entry['logs'].get(today)
+    if log is None:
+        log = DayLog.from_raw(entry['raw'], today)
+        entry['logs'] = {today: log}
+    return log.copy()
+
+
+# Drop a file's entry; called by writers that replace the whole file
+def forget(path):
+    _cache.pop(path, None)
+
+
+def clear_cache():
+    _cache.clear()
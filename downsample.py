@@ -0,0 +1,38 @@
+import numpy as np
+
+
+# Largest-Triangle-Three-Buckets: indices of at most max_points points that
+# keep the visual shape of the series (x ascending). The first and last points
+# are always kept; every bucket in between contributes the point forming the
+# largest triangle with the previously kept point and the next bucket's mean.
+def lttb_indices(x, y, max_points):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    # Bucket b covers [edges[b], edges[b + 1]) of the points between the ends
+    edges = (np.arange(max_points - 1) * (n - 2) / (max_points - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+    # The last bucket looks ahead to the final point
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(max_points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        area = np.abs((x[a] - mean_x[b]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y[b] - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[b + 1] = a
+    return keep
+
+
+def lttb(x, y, max_points):
+    keep = lttb_indices(x, y, max_points)
+    return np.asarray(x)[keep], np.asarray(y)[keep]
@@ -2,161 +2,98 @@ import streamlit as st
 import pandas as pd
 import os
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.metrics import r2_score
-from datetime import date
+from autosave import get_autosaver, status_text
+from gap_fill import midwest_today
+from model import EPOCH_ORDINAL, DayLog
+from storage import get_storage
+from windowed_editor import autosave_pending, clear_pending, rerun_section, windowed_log_editor
 
 # File path
 FILE_PATH = "exercise_data.csv"
-
-# Load existing data or create a new one
-if os.path.exists(FILE_PATH):
-    df = pd.read_csv(FILE_PATH)
-else:
-    df = pd.DataFrame(columns=["Date", "Hours", "Score"])
-
-# Convert to datetime and fill missing dates
-try:
-    df['Date'] = pd.to_datetime(df['Date'])
-    all_dates = pd.date_range(df['Date'].min(), pd.Timestamp.today(), freq='D')
-    missing_dates = all_dates.difference(df['Date'])
-    for d in missing_dates:
-        df = pd.concat([df, pd.DataFrame([{'Date': d, 'Hours': '', 'Score': 0}])], ignore_index=True)
-    df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
-except:
-    df = pd.DataFrame([{'Date': date.today().strftime('%Y-%m-%d'), 'Hours': '', 'Score': 0}])
-
-# Ensure proper data types
-df["Hours"] = df["Hours"].astype(str)
-df = df.sort_values('Date', ascending=False).reset_index(drop=True)
-
-col1, col2 = st.columns([1, 1])
-with col1:
-    st.write("### Exercise Log")
+# Storage backend: "csv" rewrites the file on save, "append" keeps a change log,
+# "sqlite" keeps a separate log per user in one database
+STORAGE = os.environ.get("EXERCISE_STORAGE", "csv")
+user = st.sidebar.text_input("User", "default") if STORAGE == "sqlite" else None
+storage = get_storage(FILE_PATH, STORAGE, user=user)
+# Save edits in the background instead of with the Save button
+autosave = st.sidebar.checkbox("Autosave", value=True)
+
+# The log (editor, table and chart) and the avatar rerun on their own
+# (st.fragment), so editing a cell doesn't redraw the avatar and its button
+# doesn't reload the log.
+@st.fragment
+def log_section():
+    # Load existing data as a typed day/hours log (cached by file size and mtime)
+    # or create a new one
+    try:
+        log = storage.load_log() if storage.exists() else DayLog.from_raw(pd.DataFrame())
+    except:
+        log = DayLog.from_raw(pd.DataFrame())
+
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        st.write("### Exercise Log")
     
-    edited_df = st.data_editor(
-        df,
-        column_config={
-            "Date": st.column_config.TextColumn(disabled=True),
-            "Score": st.column_config.NumberColumn(disabled=True),
-            "Hours": st.column_config.TextColumn()
-        },
-        num_rows="dynamic"
-    )
-
-    # Filter out empty rows
-    edited_df = edited_df[edited_df['Date'].astype(bool)]
-
-    # Update values in original dataframe
-    for _, row in edited_df.iterrows():
-        date_str = row['Date']
-        hours_str = row['Hours']
-        try:
-            hours = float(hours_str) if hours_str.strip() else 0
-        except:
-            hours = 0
-            
-        score = round(hours / 3, 2)
-        df.loc[df['Date'] == date_str, ['Hours', 'Score']] = [hours_str, score]
-
-    if st.button("Save"):
-        df.to_csv(FILE_PATH, index=False)
-        st.rerun()
-
-with col2:
-    # Display updated data
-    st.write("### Updated Data")
-    st.write(df[["Date", "Score", "Hours"]])
-
-######plot
-st.write("### Analysis & Trends")
-
-import matplotlib.dates as mdates
-
-# Assuming df is your DataFrame and it has columns "Date" and "Score"
-df["Date_Num"] = pd.to_datetime(df["Date"]).map(pd.Timestamp.toordinal)
-df = df.sort_values("Date_Num")
-
-# Filter out empty scores
-df = df[df["Score"] > 0]
-
-if len(df) > 1:
-    X = df["Date_Num"].values.reshape(-1, 1)
-    y = df["Score"].values
-
-    # --- Linear Regression ---
-    lin_reg = LinearRegression()
-    lin_reg.fit(X, y)
-    y_pred_linear = lin_reg.predict(X)
-    r2_linear = r2_score(y, y_pred_linear)
-
-    # --- Polynomial Regression (Degree 2) ---
-    poly = PolynomialFeatures(degree=2)
-    X_poly = poly.fit_transform(X)
-    poly_reg = LinearRegression()
-    poly_reg.fit(X_poly, y)
-    y_pred_poly = poly_reg.predict(X_poly)
-    r2_poly = r2_score(y, y_pred_poly)
-
-    # --- SINGLE PLOT ---
-    fig, ax = plt.subplots(figsize=(10, 6))
-
-    # Scatter plot with dashed line connecting actual points
-    sns.scatterplot(x=df["Date"], y=df["Score"], ax=ax, color="blue", label="Actual Scores")
-    ax.plot(df["Date"], df["Score"], linestyle="dashed", color="blue", alpha=0.6)
-
-    # Plot the regression lines
-    ax.plot(df["Date"], y_pred_linear, color="red", label=f"Linear Regression (R² = {r2_linear:.2f})")
-    ax.plot(df["Date"], y_pred_poly, color="green", label=f"Polynomial Regression (R² = {r2_poly:.2f})")
-
-    # Format the X-axis to show a label every 7 days
-    ax.xaxis.set_major_locator(mdates.DayLocator(interval=7))
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-
-    # Rotate the date labels for better readability
-    plt.xticks(rotation=45)
-
-    # Add labels and legend
-    ax.set_xlabel("Date")
-    ax.set_ylabel("Score")
-    ax.legend()
-
-    # Show the plot
-    plt.tight_layout()
-    plt.show()
+        # Only one page of days goes to the browser; edits are kept per session
+        # and merged into the complete log
+        pending = st.session_state.setdefault("pending_edits", {})
+        page = windowed_log_editor(storage, midwest_today(), pending)
+        changed_dates = log.apply_edits(pending)
+
+        if autosave:
+            saver = get_autosaver(storage)
+            autosave_pending(saver, log.frame_for(changed_dates), pending)
+            st.caption(status_text(saver))
+        elif st.button("Save"):
+            storage.save_changes(log.frame_for(changed_dates))
+            clear_pending(pending)
+            rerun_section()
+
+    with col2:
+        # Display updated data for the page being edited
+        st.write("### Updated Data")
+        st.write(page[["Date", "Score", "Hours"]])
+
+    ######plot
+    st.write("### Analysis & Trends")
+
+    # Days with a score, as ordinals for regression analysis
+    days, scores = log.active()
+    days = days + EPOCH_ORDINAL
+
+    if len(days) > 1:
+        # The chart is rendered once per data/theme and cached; the plotting
+        # stack is only imported once there is something to plot
+        from charts import render_trend_chart
+        theme = st.get_option("theme.base") or "light"
+        st.image(render_trend_chart(days, scores, theme=theme), use_container_width=True)
+    else:
+        st.warning("Not enough data for regression analysis. Enter more scores!")
+
+
+log_section()
 
 ##################################################
 import streamlit as st
-from boy_image import create_boy_image
+from boy_image import boy_image_png
 
-# Set up the Streamlit app
-st.write("====================================")
-st.write("Who am I:")
 
-# Generate the resized boy image
-boy_image = create_boy_image()
+@st.fragment
+def avatar_section():
+    # Set up the Streamlit app
+    st.write("====================================")
+    st.write("Who am I:")
 
-# Define the new dimensions (width, height)
-new_width = 100
-new_height = 150
+    # Define the original and larger dimensions
+    original_width, original_height = 100, 150  # Original size
+    larger_width, larger_height = 600, 800      # Larger size
 
-# Define the original and larger dimensions
-original_width, original_height = 100, 150  # Original size
-larger_width, larger_height = 600, 800      # Larger size
+    # The image is drawn directly at each size and the PNG is cached
+    st.image(boy_image_png(original_width, original_height), caption="This is me!", use_container_width=False)
 
-# Resize the image to the original size
-resized_boy_image = boy_image.resize((original_width, original_height))
+    # Add a button to show the larger image
+    if st.button("Show Larger Image"):
+        st.image(boy_image_png(larger_width, larger_height), caption="This is me (larger)!", use_container_width=False)
 
-# Display the original-sized image
-st.image(resized_boy_image, caption="This is me!", use_container_width=False)
 
-# Add a button to show the larger image
-if st.button("Show Larger Image"):
-    # Resize the image to the larger size
-    larger_boy_image = boy_image.resize((larger_width, larger_height))
-    
-    # Display the larger image
-    st.image(larger_boy_image, caption="This is me (larger)!", use_container_width=False)
+avatar_section()
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+
+# Parse a whole column of Hours strings at once; blanks and bad input count as 0
+def parse_hours(hours):
+    hours = pd.Series(hours, dtype=object).astype(str).str.strip()
+    return pd.to_numeric(hours, errors='coerce').fillna(0).to_numpy(dtype=float)
+
+
+def score_from_hours(hours):
+    return np.round(np.asarray(hours, dtype=float) / 3, 2)
+
+
+# Apply the changes recorded by st.data_editor (st.session_state[key]) to df.
+# Only the edited cells are read: edited rows are addressed by position, added
+# rows are matched by date. Returns the updated frame and the list of dates
+# whose Hours changed, so the cost is O(changed rows) rather than O(history).
+def apply_editor_edits(df, edit_state):
+    edit_state = edit_state or {}
+    positions, hours_str = [], []
+    for pos, values in edit_state.get('edited_rows', {}).items():
+        if 'Hours' in values:
+            positions.append(int(pos))
+            hours_str.append(values['Hours'])
+    added = [row for row in edit_state.get('added_rows', []) if row.get('Date') and 'Hours' in row]
+    if not positions and not added:
+        return df, []
+
+    # Added rows are looked up through a date index; new dates are appended
+    new_rows = []
+    if added:
+        date_index = pd.Index(df['Date'])
+        for row, pos in zip(added, date_index.get_indexer([row['Date'] for row in added])):
+            if pos >= 0:
+                positions.append(int(pos))
+                hours_str.append(row['Hours'])
+            else:
+                new_rows.append(row)
+
+    hours_str = np.array(['' if v is None else str(v) for v in hours_str], dtype=object)
+    dates = list(df['Date'].to_numpy()[positions]) if positions else []
+    if positions:
+        if df['Score'].dtype != float:
+            df['Score'] = df['Score'].astype(float)
+        df.iloc[positions, df.columns.get_loc('Score')] = score_from_hours(parse_hours(hours_str))
+        df.iloc[positions, df.columns.get_loc('Hours')] = hours_str
+    if new_rows:
+        new_hours = ['' if row['Hours'] is None else str(row['Hours']) for row in new_rows]
+        new_rows = pd.DataFrame({
+            'Date': [row['Date'] for row in new_rows],
+            'Score': score_from_hours(parse_hours(new_hours)),
+            'Hours': new_hours,
+        })
+        df = pd.concat([df, new_rows], ignore_index=True)
+        dates += list(new_rows['Date'])
+    return df, dates
@@ -2,159 +2,209 @@ import streamlit as st
 import pandas as pd
 import os
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.metrics import r2_score
-from datetime import date, datetime
-import pytz
-import matplotlib.dates as mdates
-
-# Set the Midwest time zone (Central Time)
-midwest_tz = pytz.timezone('US/Central')
+from collections import deque
+from activities import ActivityStorage
+from activity_editor import activity_log_panel
+from autosave import get_autosaver, status_text
+from boy_image import boy_image_png
+from gap_fill import midwest_today
+from model import DayLog
+from profiling import RerunProfile, history_jsonl, history_table, latency_table, section_profile
+from rolling import session_rolling_analytics
+from stages import analysis_graph
+from storage import get_storage
+from windowed_editor import autosave_pending, windowed_log_editor
 
 # File path
 FILE_PATH = "exercise_data.csv"
-
-# Load existing data or create a new one
-if os.path.exists(FILE_PATH):
-    df = pd.read_csv(FILE_PATH)
-else:
-    # Initialize DataFrame with today's date in Midwest time zone
-    today_midwest = datetime.now(midwest_tz).strftime('%Y-%m-%d')
-    df = pd.DataFrame(columns=["Date", "Hours", "Score"])
-    df = pd.concat([df, pd.DataFrame([{'Date': today_midwest,  'Score': 0, 'Hours': '' }])], ignore_index=True)
-
-# Convert to datetime and fill missing dates
-try:
-    df['Date'] = pd.to_datetime(df['Date']).dt.tz_localize('UTC').dt.tz_convert(midwest_tz)
-    all_dates = pd.date_range(df['Date'].min(), pd.Timestamp.today(tz=midwest_tz), freq='D')
-    missing_dates = all_dates.difference(df['Date'])
-    for d in missing_dates:
-        df = pd.concat([df, pd.DataFrame([{'Date': d, 'Score': 0, 'Hours': '' }])], ignore_index=True)
-    df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')  # Store dates as strings for CSV compatibility
-except Exception as e:
-    st.error(f"Error processing dates: {e}")
-    df = pd.DataFrame([{'Date': date.today().strftime('%Y-%m-%d'), 'Score': 0,  'Hours': ''}])
-
-# Ensure proper data types
-df["Hours"] = df["Hours"].astype(str)
-df = df.sort_values('Date', ascending=False).reset_index(drop=True)
-
-col1, col2 = st.columns([1, 1])
-with col1:
-    st.write("### Exercise Log")
-    
-    # Pre-fill new rows with today's date in Midwest time zone
-    today_midwest = datetime.now(midwest_tz).strftime('%Y-%m-%d')
-    if df.empty or df.iloc[0]['Date'] != today_midwest:
-        df = pd.concat([pd.DataFrame([{'Date': today_midwest, 'Score': 0,  'Hours': '' }]), df], ignore_index=True)
-
-    edited_df = st.data_editor(
-        df,
-        column_config={
-            "Date": st.column_config.TextColumn(disabled=True),
-            "Score": st.column_config.NumberColumn(disabled=True),
-            "Hours": st.column_config.TextColumn()
-        },
-        num_rows="dynamic"
-    )
-    # Filter out empty rows
-    edited_df = edited_df[edited_df['Date'].astype(bool)]
-    # Update values in original dataframe
-    for _, row in edited_df.iterrows():
-        date_str = row['Date']
-        hours_str = row['Hours']
+ACTIVITY_PATH = "daily_data.csv"
+# Storage backend: "csv" rewrites the file on save, "append" keeps a change log,
+# "sqlite" keeps a separate log per user in one database
+STORAGE = os.environ.get("EXERCISE_STORAGE", "csv")
+user = st.sidebar.text_input("User", "default") if STORAGE == "sqlite" else None
+storage = get_storage(FILE_PATH, STORAGE, user=user)
+
+# Per-phase timings for this rerun; memory peaks too when debugging
+debug = st.sidebar.checkbox("Debug timings")
+profile = RerunProfile(st.session_state.setdefault("rerun_history", deque(maxlen=50)), track_memory=debug)
+
+# The page is split into sections that rerun on their own (st.fragment): a
+# widget inside a section reruns only that section. The log section chains
+# editor -> summary -> chart, passing the log between them, so an edit reruns
+# those three; the chart is only redrawn when the scored days change (its
+# cache is keyed by their fingerprint). Activities, the import-time report and
+# the avatar don't depend on the log and keep their output.
+# Within the log section, the steps from the loaded log to the chart are
+# stages of a per-session graph (stages.py): a stage only reruns when the
+# content of its inputs changed, so paging or a rerun with no new edits
+# reuses the edited log, fits and chart.
+
+
+# Load existing data or create a new one. The log is kept as typed day/hours
+# arrays (recorded days through today), cached by file size and mtime,
+# so unchanged reruns skip the disk.
+def load_section(profile):
+    with profile.phase("load"):
         try:
-            hours = float(hours_str) if hours_str.strip() else 0
-        except:
-            hours = 0
-            
-        score = round(hours / 3, 2)
-        df.loc[df['Date'] == date_str, ['Score',  'Hours' ]] = [score, hours_str]
-
-with col2:
-    # Display updated data
-    st.write("### Updated Data")
-    st.write(df[["Date","Score",   "Hours"]])
+            return storage.load_log(today=midwest_today()) if storage.exists() else DayLog.from_raw(pd.DataFrame())
+        except Exception as e:
+            st.error(f"Error processing dates: {e}")
+            return DayLog.from_raw(pd.DataFrame())
 
-######plot
-st.write("### Analysis & Trends")
-# Convert Date to numerical format for regression analysis
-df["Date_Num"] = pd.to_datetime(df["Date"]).map(pd.Timestamp.toordinal)
-df = df.sort_values("Date_Num")
-# Filter out empty scores
-df = df[df["Score"] > 0]
-if len(df) > 1:
-    X = df["Date_Num"].values.reshape(-1, 1)
-    y = df["Score"].values
-    # --- Linear Regression ---
-    lin_reg = LinearRegression()
-    lin_reg.fit(X, y)
-    y_pred_linear = lin_reg.predict(X)
-    r2_linear = r2_score(y, y_pred_linear)
-    # --- Polynomial Regression (Degree 2) ---
-    poly = PolynomialFeatures(degree=2)
-    X_poly = poly.fit_transform(X)
-    poly_reg = LinearRegression()
-    poly_reg.fit(X_poly, y)
-    y_pred_poly = poly_reg.predict(X_poly)
-    r2_poly = r2_score(y, y_pred_poly)
-    # --- SINGLE PLOT ---
-    fig, ax = plt.subplots(figsize=(10, 6))
-    # Scatter plot with dashed line connecting actual points
-    sns.scatterplot(x=pd.to_datetime(df["Date"]), y=df["Score"], ax=ax, color="blue", label="Actual Scores")
-    ax.plot(pd.to_datetime(df["Date"]), df["Score"], linestyle="dashed", color="blue", alpha=0.6)
-    # Linear regression line
-    ax.plot(pd.to_datetime(df["Date"]), y_pred_linear, color="red", label=f"Linear Fit (R²={r2_linear:.3f})")
-    # Polynomial regression line
-    ax.plot(pd.to_datetime(df["Date"]), y_pred_poly, color="green", label=f"Polynomial Fit (R²={r2_poly:.3f})")
-    # Grid lines
-    ax.grid(True, linestyle="--", alpha=0.6)  # Add dashed grid with transparency
-    ax.set_title("Score Analysis: Actual Data, Linear & Polynomial Regression")
-    ax.set_xlabel("Date")
-    ax.set_ylabel("Score")
-    ax.legend()
-    
-    # Format the X-axis to show a label every 7 days
-    ax.xaxis.set_major_locator(mdates.DayLocator(interval=7))
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-    
-    ax.tick_params(axis='x', rotation=45)
-    # Show plot in Streamlit
-    st.pyplot(fig)
-else:
-    st.warning("Not enough data for regression analysis. Enter more scores!")
-##################################################
-import streamlit as st
-from boy_image import create_boy_image
 
-# Set up the Streamlit app
-st.write("====================================")
-st.write("Who am I:")
-
-# Generate the resized boy image
-boy_image = create_boy_image()
+# Paged editor; pending edits are applied to the log and autosaved.
+# Returns the edited log, the page and the edited dates.
+def editor_section(profile, graph, log, base_key):
+    st.write("### Exercise Log")
 
-# Define the new dimensions (width, height)
-new_width = 100
-new_height = 150
+    # Only one page of days goes to the browser; edits are kept per session
+    # and merged into the complete log
+    with profile.phase("editor"):
+        pending = st.session_state.setdefault("pending_edits", {})
+        page = windowed_log_editor(storage, midwest_today(), pending)
+    with profile.phase("edit_apply"):
+        graph.set_input("log", log, key=base_key)
+        graph.set_input("pending", pending)
+        log, changed_dates = graph.get("edited")
+    # Edited days are saved in the background a moment after typing stops
+    with profile.phase("autosave"):
+        saver = get_autosaver(storage)
+        autosave_pending(saver, log.frame_for(changed_dates), pending)
+        st.caption(status_text(saver))
+    return log, page, changed_dates
+
+
+# Display updated data with moving averages, streaks and hour totals
+def summary_section(profile, log, base_key, page, changed_dates):
+    st.write("### Updated Data")
+    with profile.phase("summary"):
+        rolling = session_rolling_analytics(st.session_state.setdefault("rolling", {}), base_key, log, changed_dates)
+        st.write(page[["Date","Score",   "Hours"]].merge(rolling.moving_averages(), on="Date", how="left"))
+        streak_col, longest_col = st.columns(2)
+        streak_col.metric("Current streak", f"{rolling.current_streak} days")
+        longest_col.metric("Longest streak", f"{rolling.longest_streak} days")
+        week_col, month_col = st.columns(2)
+        week_col.metric("Hours this week", f"{rolling.weekly_totals().iloc[-1]:.1f}")
+        month_col.metric("Hours this month", f"{rolling.monthly_totals().iloc[-1]:.1f}")
 
-# Define the original and larger dimensions
-original_width, original_height = 100, 150  # Original size
-larger_width, larger_height = 600, 800      # Larger size
 
-# Resize the image to the original size
-resized_boy_image = boy_image.resize((original_width, original_height))
+######plot
+def chart_section(profile, graph):
+    st.write("### Analysis & Trends")
+    with profile.phase("prepare"):
+        # Days with a score, as ordinals for regression analysis
+        days, scores = graph.get("active")
+    if len(days) > 1:
+        # The chart is rendered once per data/theme and cached
+        graph.set_input("theme", st.get_option("theme.base") or "light")
+        with profile.phase("chart"):
+            st.image(graph.get("chart"), use_container_width=True)
+        # Polynomial degree picked by time-series cross-validation, extended
+        # with a 95% prediction band
+        with profile.phase("forecast"):
+            forecast = graph.get("forecast")
+            if forecast is None:
+                st.info("Not enough data for a forecast yet. Enter more scores!")
+            else:
+                table, degree, rmse = forecast
+                st.write(f"Forecast: degree-{degree} trend (cross-validated RMSE {rmse:.2f})")
+                st.line_chart(table)
+    else:
+        st.warning("Not enough data for regression analysis. Enter more scores!")
+    return len(days)
+
+
+@st.fragment
+def log_fragment(profile):
+    with section_profile(profile, "log") as profile:
+        log = load_section(profile)
+        graph = st.session_state.setdefault("stage_graph", analysis_graph())
+        # Fingerprint of the log as loaded, before this rerun's edits
+        base_key = log.fingerprint()
+        col1, col2 = st.columns([1, 1])
+        with col1:
+            log, page, changed_dates = editor_section(profile, graph, log, base_key)
+        with col2:
+            summary_section(profile, log, base_key, page, changed_dates)
+        return chart_section(profile, graph)
+
+
+######activities
+# Several activities per day, each scored with its own weight
+@st.fragment
+def activities_fragment(profile):
+    with section_profile(profile, "activities") as profile:
+        st.write("### Activities")
+        with profile.phase("activities"):
+            activity_log_panel(ActivityStorage(ACTIVITY_PATH), midwest_today())
+
+
+# Startup cost of each dependency, measured in a fresh interpreter on request
+@st.fragment
+def import_report_fragment():
+    with st.expander("Import-time report"):
+        if st.button("Measure import times"):
+            from import_report import top_level_report
+            st.write(top_level_report())
+
+
+# Weekly/monthly/yearly leaderboard across the users of the SQLite backend,
+# read from its rollup totals rather than the users' logs
+@st.fragment
+def leaderboard_fragment(profile):
+    with section_profile(profile, "leaderboard") as profile:
+        st.write("### Leaderboard")
+        grain = st.radio("Period", ["week", "month", "year"], horizontal=True, key="leaderboard_grain",
+                         format_func=str.title)
+        with profile.phase("leaderboard"):
+            choices = storage.periods(grain)
+            if not choices:
+                st.info("Nothing logged yet.")
+                return
+            period = st.selectbox("Which", choices, key=f"leaderboard_{grain}")
+            st.dataframe(storage.leaderboard(grain, period), hide_index=True)
+            everyone_col, mine_col = st.columns(2)
+            everyone_col.write("Everyone")
+            everyone_col.dataframe(storage.period_summary(grain, everyone=True).tail(12), hide_index=True)
+            mine_col.write(f"{storage.user}")
+            mine_col.dataframe(storage.period_summary(grain).tail(12), hide_index=True)
 
-# Display the original-sized image
-st.image(resized_boy_image, caption="This is me!", use_container_width=False)
 
-# Add a button to show the larger image
-if st.button("Show Larger Image"):
-    # Resize the image to the larger size
-    larger_boy_image = boy_image.resize((larger_width, larger_height))
-    
-    # Display the larger image
-    st.image(larger_boy_image, caption="This is me (larger)!", use_container_width=False)
+##################################################
+@st.fragment
+def avatar_fragment(profile):
+    with section_profile(profile, "avatar") as profile:
+        # Set up the Streamlit app
+        st.write("====================================")
+        st.write("Who am I:")
+
+        # Define the original and larger dimensions
+        original_width, original_height = 100, 150  # Original size
+        larger_width, larger_height = 600, 800      # Larger size
+
+        with profile.phase("avatar"):
+            # The image is drawn directly at each size and the PNG is cached
+            st.image(boy_image_png(original_width, original_height), caption="This is me!", use_container_width=False)
+
+            # Add a button to show the larger image
+            if st.button("Show Larger Image"):
+                st.image(boy_image_png(larger_width, larger_height), caption="This is me (larger)!", use_container_width=False)
+
+
+scored_days = log_fragment(profile)
+activities_fragment(profile)
+if STORAGE == "sqlite":
+    leaderboard_fragment(profile)
+import_report_fragment()
+avatar_fragment(profile)
+
+# Timings of the last reruns (full and per section), and a JSON-lines export
+# of them. Sections that reran on their own show up on the next full rerun.
+profile.finish(scored_days=scored_days)
+if debug:
+    with st.expander("Rerun timings", expanded=True):
+        st.bar_chart(latency_table(profile.history), y_label="ms")
+        st.dataframe(history_table(profile.history))
+        st.write("Pipeline stages (reused / recomputed)")
+        st.dataframe(st.session_state["stage_graph"].stats_table())
+        st.download_button("Download JSON lines", history_jsonl(profile.history), "rerun_timings.jsonl")
@@ -2,154 +2,134 @@ import streamlit as st
 import pandas as pd
 import os
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.metrics import r2_score
 from datetime import date
+from autosave import get_autosaver, status_text
+from edits import apply_editor_edits
+from gap_fill import fill_window
+from windowed_editor import rerun_section
+from model import EPOCH_ORDINAL, to_day_numbers
+from storage import get_storage
 
 # File path
 FILE_PATH = "exercise_data.csv"
-
-# Load existing data or create a new one
-if os.path.exists(FILE_PATH):
-    df = pd.read_csv(FILE_PATH)
-else:
-    df = pd.DataFrame(columns=["Date", "Hours", "Score"])
-
-# Ensure "Date" column is a string
-df["Date"] = df["Date"].astype(str)
-
-# Get today's date
-today = date.today().strftime("%Y-%m-%d")
-
-# Check if today's date is already in the file
-if today not in df["Date"].values:
-    new_entry = pd.DataFrame([{"Date": today, "Score": 0, "Hours": ""}])
-    df = pd.concat([df, new_entry], ignore_index=True)
-
-# Ensure "Hours" is treated as a string to allow blank input
-df["Hours"] = df["Hours"].astype(str)
-
-# Create two text areas side-by-side
-col1, col2 = st.columns([1, 1])
-with col1:
-    st.write("### Exercise Log")
-# Editable table
-    edited_df = st.data_editor(
-        df,
-        column_config={
-            "Date": st.column_config.TextColumn(disabled=True),
-            "Score": st.column_config.NumberColumn(disabled=True),
-            "Hours": st.column_config.TextColumn()
-        },
-        num_rows="dynamic"
-    )
-
-    # Update dataframe with user input
-    for i, row in edited_df.iterrows():
-        try:
-            hours = float(row["Hours"]) if row["Hours"].strip() else 0
-        except ValueError:
-            hours = 0
-        
-        df.at[i, "Score"] = round(hours / 3, 2)
-        df.at[i, "Hours"] = row["Hours"]
+# Storage backend: "csv" rewrites the file on save, "append" keeps a change log,
+# "sqlite" keeps a separate log per user in one database
+STORAGE = os.environ.get("EXERCISE_STORAGE", "csv")
+user = st.sidebar.text_input("User", "default") if STORAGE == "sqlite" else None
+storage = get_storage(FILE_PATH, STORAGE, user=user)
+# Save edits in the background instead of with the Save button
+autosave = st.sidebar.checkbox("Autosave", value=True)
+
+# The log (editor, table and chart) and the avatar rerun on their own
+# (st.fragment), so editing a cell doesn't redraw the avatar and its button
+# doesn't reload the log.
+@st.fragment
+def log_section():
+    # Load existing data (cached by file size and mtime) or create a new one.
+    # With autosave the table keeps the rows it started the session with, so a
+    # background save doesn't reset the editor; its edits are applied on top.
+    if autosave and "log_snapshot" in st.session_state:
+        df = st.session_state["log_snapshot"].copy()
+    elif storage.exists():
+        df = storage.load()
+    else:
+        df = pd.DataFrame(columns=["Date", "Hours", "Score"])
+    if autosave:
+        st.session_state.setdefault("log_snapshot", df.copy())
+    else:
+        st.session_state.pop("log_snapshot", None)
+
+    # Ensure "Date" column is a string
+    df["Date"] = df["Date"].astype(str)
+
+    # Get today's date
+    today = date.today().strftime("%Y-%m-%d")
+
+    # Only recorded days are stored; show every day from the first one through
+    # today, so days without hours can still be filled in
+    start = min(df["Date"].min(), today) if len(df) else today
+    df = fill_window(df, start, today)
+
+    # Ensure "Hours" is treated as a string to allow blank input
+    df["Hours"] = df["Hours"].astype(str)
+
+    # Create two text areas side-by-side
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        st.write("### Exercise Log")
+    # Editable table
+        edited_df = st.data_editor(
+            df,
+            column_config={
+                "Date": st.column_config.TextColumn(disabled=True),
+                "Score": st.column_config.NumberColumn(disabled=True),
+                "Hours": st.column_config.TextColumn()
+            },
+            num_rows="dynamic",
+            key="log_editor"
+        )
+
+        # Update dataframe with the cells changed in the editor
+        df, changed_dates = apply_editor_edits(df, st.session_state.get("log_editor"))
         
-    if st.button("Save"):
-        # Save updated data back to CSV
-        df.to_csv(FILE_PATH, index=False)
-        st.rerun()
-
-with col2:
-    # Display updated data
-    st.write("### Updated Data")
-    #st.write(df[["Date", "Score", "Hours"]])
-    st.write(df[["Date", "Score", "Hours"]].tail(5))
-
-####################plot
-st.write("### Analysis & Trends")
-# Convert Date to numerical format for regression analysis
-df["Date_Num"] = pd.to_datetime(df["Date"]).map(pd.Timestamp.toordinal)
-df = df.sort_values("Date_Num")
-
-# Filter out empty scores
-df = df[df["Score"] > 0]
-
-if len(df) > 1:
-    X = df["Date_Num"].values.reshape(-1, 1)
-    y = df["Score"].values
-
-    # --- Linear Regression ---
-    lin_reg = LinearRegression()
-    lin_reg.fit(X, y)
-    y_pred_linear = lin_reg.predict(X)
-    r2_linear = r2_score(y, y_pred_linear)
-
-    # --- Polynomial Regression (Degree 2) ---
-    poly = PolynomialFeatures(degree=2)
-    X_poly = poly.fit_transform(X)
-    poly_reg = LinearRegression()
-    poly_reg.fit(X_poly, y)
-    y_pred_poly = poly_reg.predict(X_poly)
-    r2_poly = r2_score(y, y_pred_poly)
-
-    # --- SINGLE PLOT ---
-    fig, ax = plt.subplots(figsize=(10, 6))
-
-    # Scatter plot with dashed line connecting actual points
-    sns.scatterplot(x=df["Date"], y=df["Score"], ax=ax, color="blue", label="Actual Scores")
-    ax.plot(df["Date"], df["Score"], linestyle="dashed", color="blue", alpha=0.6)
-
-    # Linear regression line
-    ax.plot(df["Date"], y_pred_linear, color="red", label=f"Linear Fit (R²={r2_linear:.3f})")
-
-    # Polynomial regression line
-    ax.plot(df["Date"], y_pred_poly, color="green", label=f"Polynomial Fit (R²={r2_poly:.3f})")
-    # Grid lines
-    ax.grid(True, linestyle="--", alpha=0.6)  # Add dashed grid with transparency
-    ax.set_title("Score Analysis: Actual Data, Linear & Polynomial Regression")
-    ax.set_xlabel("Date")
-    ax.set_ylabel("Score")
-    ax.legend()
-    ax.tick_params(axis='x', rotation=45)
-
-    # Show plot in Streamlit
-    st.pyplot(fig)
-
-else:
-    st.warning("Not enough data for regression analysis. Enter more scores!")
+        if autosave:
+            saver = get_autosaver(storage)
+            saver.queue(df[df["Date"].isin(changed_dates)], st.session_state.setdefault("autosaved_rows", {}))
+            st.caption(status_text(saver))
+        elif st.button("Save"):
+            # Save only the changed days
+            storage.save_changes(df[df["Date"].isin(changed_dates)])
+            rerun_section()
+
+    with col2:
+        # Display updated data
+        st.write("### Updated Data")
+        #st.write(df[["Date", "Score", "Hours"]])
+        st.write(df[["Date", "Score", "Hours"]].tail(5))
+
+    ####################plot
+    st.write("### Analysis & Trends")
+    # Convert Date to numerical format for regression analysis
+    df["Date_Num"] = to_day_numbers(df["Date"]).astype(np.int64) + EPOCH_ORDINAL
+    df = df.sort_values("Date_Num")
+
+    # Filter out empty scores
+    df = df[df["Score"] > 0]
+
+    if len(df) > 1:
+        # The chart is rendered once per data/theme and cached; the plotting
+        # stack is only imported once there is something to plot
+        from charts import render_trend_chart
+        theme = st.get_option("theme.base") or "light"
+        st.image(render_trend_chart(df["Date_Num"].values, df["Score"].values, theme=theme), use_container_width=True)
+
+    else:
+        st.warning("Not enough data for regression analysis. Enter more scores!")
+
+
+log_section()
 
 ##################################################
 import streamlit as st
-from boy_image import create_boy_image
+from boy_image import boy_image_png
 
-# Set up the Streamlit app
-st.write("====================================")
-st.write("Who am I:")
 
-# Generate the resized boy image
-boy_image = create_boy_image()
+@st.fragment
+def avatar_section():
+    # Set up the Streamlit app
+    st.write("====================================")
+    st.write("Who am I:")
 
-# Define the new dimensions (width, height)
-new_width = 100
-new_height = 150
+    # Define the original and larger dimensions
+    original_width, original_height = 100, 150  # Original size
+    larger_width, larger_height = 600, 800      # Larger size
 
-# Define the original and larger dimensions
-original_width, original_height = 100, 150  # Original size
-larger_width, larger_height = 600, 800      # Larger size
+    # The image is drawn directly at each size and the PNG is cached
+    st.image(boy_image_png(original_width, original_height), caption="This is me!", use_container_width=False)
 
-# Resize the image to the original size
-resized_boy_image = boy_image.resize((original_width, original_height))
+    # Add a button to show the larger image
+    if st.button("Show Larger Image"):
+        st.image(boy_image_png(larger_width, larger_height), caption="This is me (larger)!", use_container_width=False)
 
-# Display the original-sized image
-st.image(resized_boy_image, caption="This is me!", use_container_width=False)
 
-# Add a button to show the larger image
-if st.button("Show Larger Image"):
-    # Resize the image to the larger size
-    larger_boy_image = boy_image.resize((larger_width, larger_height))
-    
-    # Display the larger image
-    st.image(larger_boy_image, caption="This is me (larger)!", use_container_width=False)
+avatar_section()
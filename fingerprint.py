@@ -0,0 +1,19 @@
+import hashlib
+import numpy as np
+import pandas as pd
+
+
+# Content hash of arrays, Series or DataFrames. Frames and object columns are
+# hashed through pandas' vectorized row hashing, plain arrays by their bytes.
+def data_fingerprint(*values):
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            digest.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+            value = pd.util.hash_pandas_object(value, index=False).to_numpy()
+        value = np.ascontiguousarray(value)
+        if value.dtype == object:
+            value = pd.util.hash_array(value)
+        digest.update(str(value.dtype).encode())
+        digest.update(value.tobytes())
+    return digest.hexdigest()
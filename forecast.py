@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+
+# Trend model selection and forecasts for many logs at once. Every series is
+# fitted with polynomials of degree 1..max_degree; the degree is picked by
+# time-series cross-validation (train on the first part of the history,
+# score the next block, for `folds` expanding windows), and the chosen fit is
+# extended `horizon` days with a prediction band.
+# All series are solved together: they are padded into (users, days) arrays
+# with a mask, reduced to weighted power sums, and each degree's least-squares
+# problem is one stacked (users, degree+1, degree+1) solve. Days are centered
+# and scaled to [-1, 1] per series, which keeps the powers well conditioned.
+
+MAX_DEGREE = 3
+FOLDS = 4
+HORIZON = 30
+# Two-sided 95% normal quantile for the prediction band
+Z_95 = 1.96
+# Series solved per batch by forecast_table; bounds the padded arrays' memory
+BATCH_USERS = 1000
+
+
+# Padded (users, days) arrays of days, scores and a mask of real points.
+# Each series is (days, scores), sorted by day.
+def _pad(series):
+    lengths = np.array([len(days) for days, _ in series], dtype=np.int64)
+    width = int(lengths.max()) if len(series) else 0
+    days = np.zeros((len(series), width))
+    scores = np.zeros((len(series), width))
+    for i, (d, s) in enumerate(series):
+        days[i, :len(d)] = d
+        scores[i, :len(s)] = s
+    return days, scores, np.arange(width) < lengths[:, None], lengths
+
+
+# Σw·x^k for k <= 2·degree, Σw·y·x^k for k <= degree and Σw·y², per series
+def _moments(x, y, w, degree):
+    sx = np.empty((len(x), 2 * degree + 1))
+    sxy = np.empty((len(x), degree + 1))
+    p = w.astype(float)
+    for k in range(2 * degree + 1):
+        sx[:, k] = p.sum(axis=1)
+        if k <= degree:
+            sxy[:, k] = (p * y).sum(axis=1)
+        p = p * x
+    return sx, sxy, (w * y * y).sum(axis=1)
+
+
+# Gram matrices of one degree from the power sums (a Hankel matrix per series),
+# with a tiny ridge so series with too few points still solve
+def _gram(sx, degree):
+    gram = sx[:, np.add.outer(np.arange(degree + 1), np.arange(degree + 1))]
+    ridge = 1e-10 * (np.trace(gram, axis1=1, axis2=2) + 1.0)
+    return gram + ridge[:, None, None] * np.eye(degree + 1)
+
+
+def _polyval(coef, x):
+    result = np.zeros_like(x)
+    for k in range(coef.shape[1] - 1, -1, -1):
+        result = result * x + coef[:, k:k + 1]
+    return result
+
+
+# Fitted trends of a batch of series, one chosen degree per series. Coefficients
+# are lowest degree first on the scaled axis (days - origin) / scale and
+# zero-padded to max_degree.
+class TrendModels:
+    def __init__(self, degree, coef, inv_gram, sigma, cv_mse, origin, scale, last, n):
+        self.degree = degree
+        self.coef = coef
+        self.inv_gram = inv_gram
+        self.sigma = sigma      # residual standard deviation of the chosen fit
+        self.cv_mse = cv_mse    # (users, max_degree) validation MSE, inf where not fittable
+        self.origin = origin
+        self.scale = scale
+        self.last = last
+        self.n = n
+
+    def __len__(self):
+        return len(self.degree)
+
+    @property
+    def cv_rmse(self):
+        return np.sqrt(self.cv_mse[np.arange(len(self)), self.degree - 1])
+
+    def _x(self, days):
+        days = np.broadcast_to(np.asarray(days, dtype=float), (len(self), np.shape(days)[-1]))
+        return (days - self.origin[:, None]) / self.scale[:, None]
+
+    # Predicted scores at days ((users, k) or (k,) for the same days for all)
+    def predict(self, days):
+        return _polyval(self.coef, self._x(days))
+
+    # Days after each series' last day with the predicted score and a band of
+    # ± z standard errors of a new observation; scores can't go below zero
+    def forecast(self, horizon=HORIZON, z=Z_95):
+        days = self.last[:, None] + np.arange(1, horizon + 1)
+        x = self._x(days)
+        powers = x[:, :, None] ** np.arange(self.coef.shape[1])
+        mean = np.maximum(np.einsum("uhk,uk->uh", powers, self.coef), 0.0)
+        leverage = np.einsum("uhi,uij,uhj->uh", powers, self.inv_gram, powers)
+        spread = z * self.sigma[:, None] * np.sqrt(1.0 + leverage)
+        return days, mean, np.maximum(mean - spread, 0.0), mean + spread
+
+
+# Choose a polynomial degree per series by time-series cross-validation and
+# fit it to the whole series (each series needs at least one point). A degree
+# is only considered if every training window has more points than the degree;
+# series too short for any get degree 1.
+def select_trends(series, max_degree=MAX_DEGREE, folds=FOLDS):
+    days, scores, mask, lengths = _pad(series)
+    users = len(lengths)
+    first = days[:, 0]
+    last = days[np.arange(users), np.maximum(lengths - 1, 0)]
+    origin = np.round((first + last) / 2)
+    scale = np.maximum((last - first) / 2, 1.0)
+    x = np.where(mask, (days - origin[:, None]) / scale[:, None], 0.0)
+
+    # Expanding windows: fold f trains on the first cuts[f] points of a series
+    # and is scored on the points up to cuts[f + 1]. Each window is rescaled
+    # to [-1, 1] itself; the early ones are too narrow on the full-series axis.
+    index = np.arange(days.shape[1])
+    cuts = (lengths[:, None] * np.arange(1, folds + 2)) // (folds + 1)
+    sse = np.zeros((users, max_degree))
+    count = np.zeros((users, max_degree))
+    fittable = np.ones((users, max_degree), dtype=bool)
+    for f in range(folds):
+        train = mask & (index < cuts[:, f:f + 1])
+        test = mask & ~train & (index < cuts[:, f + 1:f + 2])
+        end = x[np.arange(users), np.maximum(cuts[:, f] - 1, 0)]
+        half = np.maximum((end - x[:, 0]) / 2, 1e-9)
+        xf = np.where(mask, (x - ((x[:, 0] + end) / 2)[:, None]) / half[:, None], 0.0)
+        sx, sxy, _ = _moments(xf, scores, train, max_degree)
+        for degree in range(1, max_degree + 1):
+            coef = np.linalg.solve(_gram(sx, degree), sxy[:, :degree + 1, None])[..., 0]
+            err = np.where(test, _polyval(coef, xf) - scores, 0.0)
+            sse[:, degree - 1] += (err * err).sum(axis=1)
+            count[:, degree - 1] += test.sum(axis=1)
+            fittable[:, degree - 1] &= sx[:, 0] > degree
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cv_mse = np.where(fittable & (count > 0), sse / count, np.inf)
+    best = np.argmin(cv_mse, axis=1) + 1
+
+    # Final fits on every point; each series keeps the one of its degree
+    sx, sxy, syy = _moments(x, scores, mask, max_degree)
+    coef = np.zeros((users, max_degree + 1))
+    inv_gram = np.zeros((users, max_degree + 1, max_degree + 1))
+    sigma = np.full(users, np.nan)
+    for degree in range(1, max_degree + 1):
+        chosen = best == degree
+        if not chosen.any():
+            continue
+        inv = np.linalg.inv(_gram(sx[chosen], degree))
+        fit = np.einsum("uij,uj->ui", inv, sxy[chosen, :degree + 1])
+        coef[chosen, :degree + 1] = fit
+        inv_gram[chosen, :degree + 1, :degree + 1] = inv
+        # SSE from the sums: Σy² - coef·(Xᵀy)
+        residual = np.maximum(syy[chosen] - (fit * sxy[chosen, :degree + 1]).sum(axis=1), 0.0)
+        dof = lengths[chosen] - degree - 1
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sigma[chosen] = np.where(dof > 0, np.sqrt(residual / dof), np.nan)
+    return TrendModels(best, coef, inv_gram, sigma, cv_mse, origin, scale, last, lengths)
+
+
+# One row per series: chosen degree, cross-validated RMSE and the forecast
+# `horizon` days out. Series are solved BATCH_USERS at a time, grouped by
+# length so little of each batch is padding.
+def forecast_table(series, names, max_degree=MAX_DEGREE, folds=FOLDS, horizon=HORIZON):
+    order = np.argsort([len(days) for days, _ in series], kind="stable")
+    rows = {}
+    for lo in range(0, len(order), BATCH_USERS):
+        batch = order[lo:lo + BATCH_USERS]
+        models = select_trends([series[i] for i in batch], max_degree, folds)
+        _, mean, lower, upper = models.forecast(horizon)
+        for j, i in enumerate(batch):
+            rows[i] = {"user": names[i], "degree": int(models.degree[j]), "cv_rmse": models.cv_rmse[j],
+                       f"forecast_{horizon}d": mean[j, -1], "forecast_low": lower[j, -1],
+                       "forecast_high": upper[j, -1]}
+    return pd.DataFrame([rows[i] for i in range(len(series))])
@@ -0,0 +1,53 @@
+import pandas as pd
+from datetime import datetime
+import pytz
+
+# Set the Midwest time zone (Central Time)
+midwest_tz = pytz.timezone('US/Central')
+
+
+# Today's date in the Midwest time zone, as a naive calendar day
+def midwest_today():
+    return pd.Timestamp(datetime.now(midwest_tz).strftime('%Y-%m-%d'))
+
+
+def _parse_log(df):
+    df = df.copy()
+    df['Date'] = pd.to_datetime(df['Date'], format='ISO8601').dt.normalize()
+    return df.dropna(subset=['Date']).drop_duplicates('Date', keep='last').set_index('Date')
+
+
+# Reindex a Date-indexed log onto every day from start to end (one pass)
+def _reindex_calendar(df, start, end):
+    df = df.reindex(pd.date_range(start, end, freq='D', unit='s'))
+
+    # Missing days get a zero score and blank hours
+    df['Score'] = df['Score'].fillna(0) if 'Score' in df else 0
+    df['Hours'] = df['Hours'].astype(object).where(df['Hours'].notna(), '') if 'Hours' in df else ''
+
+    df.index.name = 'Date'
+    df = df.reset_index()
+    df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')  # Store dates as strings for CSV compatibility
+    return df[['Date', 'Score', 'Hours'] + [c for c in df.columns if c not in ('Date', 'Score', 'Hours')]]
+
+
+# Turn a loaded log into a complete daily calendar ending today (Midwest time).
+# Dates in the log are calendar days, so they are normalized to midnight and
+# never shifted by the time zone; only "today" is taken from midwest_tz.
+# The whole fill is a single reindex, so the cost is linear in the number of days.
+def fill_missing_dates(df, today=None):
+    if today is None:
+        today = midwest_today()
+    today = pd.Timestamp(today).normalize()
+    df = _parse_log(df)
+
+    start = df.index.min() if len(df) else today
+    end = max(df.index.max(), today) if len(df) else today
+    return _reindex_calendar(df, min(start, today), end)
+
+
+# The complete calendar for just the days from start to end (inclusive)
+def fill_window(df, start, end):
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    df = _parse_log(df)
+    return _reindex_calendar(df[(df.index >= start) & (df.index <= end)], start, end)
@@ -0,0 +1,43 @@
+import subprocess
+import sys
+from functools import lru_cache
+import pandas as pd
+
+# Modules the apps load, split by when they are needed
+TABLE_MODULES = ["streamlit", "pandas", "numpy", "pytz"]
+ANALYSIS_MODULES = ["matplotlib.pyplot", "seaborn", "PIL"]
+
+
+# Per-module import times, as reported by `python -X importtime`, measured in a
+# fresh interpreter so that modules already loaded by the app don't hide the cost.
+# Returns one row per module with self/cumulative time in milliseconds.
+@lru_cache(maxsize=8)
+def import_time_report(modules=tuple(TABLE_MODULES + ANALYSIS_MODULES)):
+    code = "; ".join(f"import {m}" for m in modules) or "pass"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "Module": name.strip(),
+            "Depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "Self (ms)": int(self_us) / 1000,
+            "Cumulative (ms)": int(cumulative_us) / 1000,
+        })
+    return pd.DataFrame(rows)
+
+
+# Top-level entries only: what each requested module costs including its
+# dependencies, without the modules the interpreter loads at startup
+def top_level_report(modules=tuple(TABLE_MODULES + ANALYSIS_MODULES)):
+    startup = set(import_time_report(())["Module"])
+    report = import_time_report(tuple(modules))
+    report = report[(report["Depth"] == 0) & ~report["Module"].isin(startup)]
+    return report.sort_values("Cumulative (ms)", ascending=False).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    print(top_level_report(tuple(sys.argv[1:]) or tuple(TABLE_MODULES + ANALYSIS_MODULES)).head(20).to_string())
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+from edits import parse_hours
+from fingerprint import data_fingerprint
+from gap_fill import midwest_today
+
+# Days are stored as int32 day numbers since 1970-01-01; add this to get toordinal()
+EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+
+
+# Day numbers of a column of ISO dates, without a per-row Timestamp
+def to_day_numbers(dates):
+    days = pd.to_datetime(pd.Series(dates, dtype=object), format='ISO8601').to_numpy().astype('datetime64[D]')
+    return days.astype(np.int64).astype(np.int32)
+
+
+# Day number of one date (ISO text, date or Timestamp); day numbers pass through
+def day_number(date):
+    if isinstance(date, (int, np.integer)):
+        return int(date)
+    return int(pd.Timestamp(date).to_datetime64().astype('datetime64[D]').astype(np.int64))
+
+
+def format_days(days):
+    return np.asarray(days, dtype='int64').astype('datetime64[D]').astype(str)
+
+
+# Compact typed exercise log: one int32 day number and one float32 Hours value
+# (NaN when blank) per recorded day, with Score derived as hours / 3. Only days
+# with hours are kept; missing days are implied up to end (today), so the log
+# grows with activity rather than elapsed time. Date arithmetic is integer
+# math, and dates are only formatted as strings for display/storage.
+class DayLog:
+    def __init__(self, day, hours, end=None):
+        self.day = np.asarray(day, dtype=np.int32)
+        self.hours = np.asarray(hours, dtype=np.float32)
+        self.end = int(end) if end is not None else int(self.day[-1]) if len(self.day) else 0
+
+    def __len__(self):
+        return len(self.day)
+
+    @property
+    def score(self):
+        return np.round(np.nan_to_num(self.hours.astype(np.float64)) / 3, 2)
+
+    @property
+    def nbytes(self):
+        return self.day.nbytes + self.hours.nbytes
+
+    def copy(self):
+        return DayLog(self.day.copy(), self.hours.copy(), self.end)
+
+    # Content hash of the days, hours and end
+    def fingerprint(self):
+        return data_fingerprint(self.day, self.hours, np.array([self.end]))
+
+    # The recorded days of a raw (Date, Score, Hours) frame, padded or not.
+    # Rows with a Score but no Hours keep their score (hours = score * 3).
+    @classmethod
+    def from_raw(cls, raw, today=None):
+        today = day_number(today if today is not None else midwest_today())
+        if len(raw) == 0:
+            return cls([], [], end=today)
+        days = to_day_numbers(raw['Date'])
+        text = pd.Series(raw['Hours'], dtype=object).astype(str).str.strip()
+        hours = pd.to_numeric(text, errors='coerce').to_numpy(dtype=np.float64, copy=True)
+        if 'Score' in raw:
+            score = pd.to_numeric(pd.Series(raw['Score']), errors='coerce').to_numpy(dtype=np.float64)
+            from_score = np.isnan(hours) & (score > 0)
+            hours[from_score] = score[from_score] * 3
+
+        order = np.argsort(days, kind='stable')
+        days, hours = days[order], hours[order]
+        last = np.append(days[1:] != days[:-1], True)  # later rows win for duplicate dates
+        keep = last & (np.nan_to_num(hours) > 0)
+        return cls(days[keep], hours[keep], end=max(int(days[-1]), today))
+
+    def ordinals(self):
+        return self.day.astype(np.int64) + EPOCH_ORDINAL
+
+    # Day numbers and scores of the days with a positive score
+    def active(self):
+        score = self.score
+        keep = score > 0
+        return self.day[keep], score[keep]
+
+    # Positions of the given 'YYYY-MM-DD' dates (-1 when not in the log). When
+    # the days are contiguous this is a subtraction rather than a search.
+    def positions(self, dates):
+        days = to_day_numbers(dates)
+        if not len(self):
+            return np.full(len(days), -1, dtype=np.int64)
+        if self.day[-1] - self.day[0] == len(self) - 1:
+            pos = days.astype(np.int64) - int(self.day[0])
+            pos[(pos < 0) | (pos >= len(self))] = -1
+            return pos
+        pos = np.searchsorted(self.day, days)
+        found = (pos < len(self)) & (self.day[np.minimum(pos, len(self) - 1)] == days)
+        return np.where(found, pos, -1)
+
+    # Scores of the given 'YYYY-MM-DD' dates (0 when not in the log or blank)
+    def scores_at(self, dates):
+        pos = self.positions(dates)
+        hours = self.hours[np.maximum(pos, 0)].astype(np.float64) if len(self) else np.zeros(len(pos))
+        return np.where(pos >= 0, np.round(np.nan_to_num(hours) / 3, 2), 0.0)
+
+    # Apply edits {date: Hours text}; dates outside the log are inserted, and
+    # blanked days stay (as NaN) until saved so the save can remove them.
+    # Read-only hours (an archive's mapped view) are copied on the first edit.
+    def apply_edits(self, edits):
+        if not edits:
+            return []
+        dates = list(edits)
+        hours = parse_hours(list(edits.values())).astype(np.float32)
+        blank = np.array([str(v).strip() == '' for v in edits.values()])
+        hours[blank] = np.nan
+        pos = self.positions(dates)
+        known = pos >= 0
+        if not self.hours.flags.writeable:
+            self.hours = self.hours.copy()
+        self.hours[pos[known]] = hours[known]
+        if not known.all():
+            day = np.concatenate([self.day, to_day_numbers(np.array(dates, dtype=object)[~known])])
+            all_hours = np.concatenate([self.hours, hours[~known]])
+            order = np.argsort(day, kind='stable')
+            self.day, self.hours = day[order], all_hours[order]
+            self.end = max(self.end, int(self.day[-1]))
+        return dates
+
+    # Display/storage boundary: Date strings, Score and Hours text ('' for blank)
+    def to_frame(self, positions=None, newest_first=False):
+        day, hours = (self.day, self.hours) if positions is None else (self.day[positions], self.hours[positions])
+        frame = pd.DataFrame({
+            'Date': format_days(day),
+            'Score': np.round(np.nan_to_num(hours.astype(np.float64)) / 3, 2),
+            'Hours': np.where(np.isnan(hours), '', hours.astype(str)).astype(object),
+        })
+        return frame.iloc[::-1].reset_index(drop=True) if newest_first else frame
+
+    def frame_for(self, dates):
+        pos = self.positions(dates)
+        return self.to_frame(pos[pos >= 0])
@@ -0,0 +1,134 @@
+import json
+import os
+import time
+import tracemalloc
+import weakref
+from collections import deque
+from contextlib import contextmanager
+import pandas as pd
+
+# Set to a file path to append every rerun's timings as one JSON line
+PROFILE_LOG = os.environ.get("EXERCISE_PROFILE_LOG")
+
+
+# Sessions (by their history) whose profiles track memory. tracemalloc is
+# process-wide, so the first of them starts it and it is only stopped when
+# the last one turns tracking off, and never when it was started elsewhere.
+# A session that goes away without turning it off is dropped with its history.
+_memory_sessions = {}
+_started_tracing = False
+
+
+def _track_memory(history, on):
+    global _started_tracing
+    key = id(history)
+    if on:
+        if key not in _memory_sessions:
+            _memory_sessions[key] = weakref.ref(history, lambda _: _memory_sessions.pop(key, None))
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+    elif _memory_sessions.pop(key, None) is not None and not _memory_sessions and _started_tracing:
+        tracemalloc.stop()
+        _started_tracing = False
+
+
+# Named phase timers for one rerun of an app. With track_memory, tracemalloc
+# records the peak allocation of each phase above what was live when it began.
+# finish() adds the rerun to the history (last N reruns) and the JSON-lines log.
+# scope is "app" for a full rerun, or the section for a fragment's own rerun.
+class RerunProfile:
+    def __init__(self, history=None, track_memory=False, log_path=PROFILE_LOG, scope="app"):
+        self.history = history if history is not None else deque(maxlen=20)
+        self.track_memory = track_memory
+        self.log_path = log_path
+        self.scope = scope
+        self.section = None
+        self.finished = False
+        self.phases = []
+        self.start = time.perf_counter()
+        _track_memory(self.history, track_memory)
+
+    @contextmanager
+    def phase(self, name):
+        if self.track_memory:
+            tracemalloc.reset_peak()
+            mem_start = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {"phase": name, "seconds": time.perf_counter() - start}
+            if self.section:
+                record["section"] = self.section
+            if self.track_memory:
+                record["peak_kb"] = (tracemalloc.get_traced_memory()[1] - mem_start) / 1024
+            self.phases.append(record)
+
+    def finish(self, **extra):
+        self.finished = True
+        record = {
+            "timestamp": time.time(),
+            "scope": self.scope,
+            "total_seconds": time.perf_counter() - self.start,
+            "phases": self.phases,
+            **extra,
+        }
+        self.history.append(record)
+        if self.log_path:
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        return record
+
+
+# Timers for one section of the app (a st.fragment). During a full rerun its
+# phases go into the app's profile, tagged with the section; when the fragment
+# reruns on its own, which happens after the app's profile has finished, they
+# are recorded as a rerun of their own with the section as its scope.
+@contextmanager
+def section_profile(profile, name):
+    if not profile.finished:
+        outer, profile.section = profile.section, name
+        try:
+            yield profile
+        finally:
+            profile.section = outer
+        return
+    own = RerunProfile(profile.history, profile.track_memory, profile.log_path, scope=name)
+    try:
+        yield own
+    finally:
+        own.finish()
+
+
+# Seconds spent in one section's phases during a rerun
+def section_seconds(record, name):
+    if record.get("scope", "app") == name:
+        return record["total_seconds"]
+    return sum(p["seconds"] for p in record["phases"] if p.get("section") == name)
+
+
+# Rerun latency (ms) per rerun, oldest first, in one column per scope
+def latency_table(history):
+    rows = [{"Rerun": i, record.get("scope", "app"): round(record["total_seconds"] * 1000, 1)}
+            for i, record in enumerate(history)]
+    return pd.DataFrame(rows).set_index("Rerun") if rows else pd.DataFrame()
+
+
+# Reruns as rows, phase times (ms) and memory peaks (KB) as columns, newest first
+def history_table(history):
+    rows = []
+    for record in reversed(history):
+        row = {"Time": pd.Timestamp(record["timestamp"], unit="s").strftime("%H:%M:%S"),
+               "Scope": record.get("scope", "app"),
+               "Total (ms)": round(record["total_seconds"] * 1000, 1)}
+        for phase in record["phases"]:
+            row[f"{phase['phase']} (ms)"] = round(phase["seconds"] * 1000, 1)
+            if "peak_kb" in phase:
+                row[f"{phase['phase']} peak (KB)"] = round(phase["peak_kb"], 1)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def history_jsonl(history):
+    return "".join(json.dumps(record) + "\n" for record in history)
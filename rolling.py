@@ -0,0 +1,219 @@
+from collections import Counter
+import numpy as np
+import pandas as pd
+from model import EPOCH_ORDINAL, day_number, to_day_numbers
+
+WINDOWS = (7, 30)
+
+
+# Rolling analytics over the gap-filled daily Score/Hours series: 7- and
+# 30-day moving averages of Score, current and longest exercise streaks, and
+# weekly/monthly hour totals. The first build is vectorized; after that,
+# set_day() updates everything for one edited or appended day by touching at
+# most a window's worth of entries (and the streak containing the day).
+class RollingAnalytics:
+    def __init__(self, start_ordinal, scores, hours):
+        self.start = int(start_ordinal)
+        self.n = len(scores)
+        capacity = max(16, self.n)
+        self.scores = np.zeros(capacity)
+        self.hours = np.zeros(capacity)
+        self.scores[:self.n] = scores
+        self.hours[:self.n] = hours
+
+        # Moving averages include fewer days at the start of the log
+        self.ma = {}
+        cumsum = np.concatenate([[0.0], np.cumsum(self.scores[:self.n])])
+        for w in WINDOWS:
+            ma = np.zeros(capacity)
+            idx = np.arange(self.n)
+            lo = np.maximum(idx + 1 - w, 0)
+            ma[:self.n] = (cumsum[idx + 1] - cumsum[lo]) / (idx + 1 - lo)
+            self.ma[w] = ma
+
+        # Streaks are runs of days with hours logged
+        active = self.hours[:self.n] > 0
+        edges = np.diff(np.concatenate([[0], active.astype(np.int8), [0]]))
+        run_lengths = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+        self.runs = Counter(run_lengths.tolist())
+
+        # Hour totals per ISO week and per month
+        dates = self.dates()
+        iso = dates.isocalendar()
+        self.weekly = pd.Series(self.hours[:self.n], index=pd.MultiIndex.from_arrays(
+            [iso['year'].to_numpy(), iso['week'].to_numpy()])).groupby(level=[0, 1]).sum().to_dict()
+        self.monthly = pd.Series(self.hours[:self.n], index=pd.MultiIndex.from_arrays(
+            [dates.year, dates.month])).groupby(level=[0, 1]).sum().to_dict()
+
+    # Build from a gap-filled frame (Date, Score, Hours) in any order
+    @classmethod
+    def from_frame(cls, df):
+        days = to_day_numbers(df['Date']).astype(np.int64) + EPOCH_ORDINAL
+        order = np.argsort(days, kind='stable')
+        days = days[order]
+        hours = pd.to_numeric(pd.Series(df['Hours'].to_numpy()[order], dtype=object).astype(str).str.strip(),
+                              errors='coerce').fillna(0).to_numpy()
+        scores = pd.to_numeric(pd.Series(df['Score'].to_numpy()[order]), errors='coerce').fillna(0).to_numpy()
+        start = days[0] if len(days) else 0
+        full_scores = np.zeros(days[-1] - start + 1 if len(days) else 0)
+        full_hours = np.zeros_like(full_scores)
+        full_scores[days - start] = scores
+        full_hours[days - start] = hours
+        return cls(start, full_scores, full_hours)
+
+    # Build from a typed DayLog; days missing from it count as zero up to its end
+    @classmethod
+    def from_log(cls, log):
+        ordinals = log.ordinals()
+        end = log.end + EPOCH_ORDINAL
+        start = ordinals[0] if len(ordinals) else end
+        scores = np.zeros(max(end, ordinals[-1] if len(ordinals) else end) - start + 1)
+        hours = np.zeros_like(scores)
+        scores[ordinals - start] = log.score
+        hours[ordinals - start] = np.nan_to_num(log.hours.astype(np.float64))
+        return cls(start, scores, hours)
+
+    def dates(self):
+        return pd.to_datetime(np.arange(self.start, self.start + self.n) - EPOCH_ORDINAL, unit='D')
+
+    def _grow(self, n):
+        if n <= len(self.scores):
+            return
+        capacity = max(n, 2 * len(self.scores))
+        for name in ('scores', 'hours'):
+            grown = np.zeros(capacity)
+            grown[:self.n] = getattr(self, name)[:self.n]
+            setattr(self, name, grown)
+        for w in WINDOWS:
+            grown = np.zeros(capacity)
+            grown[:self.n] = self.ma[w][:self.n]
+            self.ma[w] = grown
+
+    def _run_around(self, i):
+        lo = i
+        while lo > 0 and self.hours[lo - 1] > 0:
+            lo -= 1
+        hi = i
+        while hi + 1 < self.n and self.hours[hi + 1] > 0:
+            hi += 1
+        return lo, hi
+
+    def _remove_run(self, length):
+        if length > 0:
+            self.runs[length] -= 1
+            if not self.runs[length]:
+                del self.runs[length]
+
+    # Record the hours/score for one day ('YYYY-MM-DD'). Days after the end of
+    # the series are appended, with zero days filling any gap.
+    def set_day(self, date, hours, score):
+        ordinal = day_number(date) + EPOCH_ORDINAL
+        i = ordinal - self.start
+        if i < 0:
+            raise ValueError(f"{date} is before the start of the log")
+        if i >= self.n:
+            self._grow(i + 1)
+            for j in range(self.n, i + 1):
+                # New empty days: the averages only lose weight from the oldest day
+                for w in WINDOWS:
+                    count = min(j + 1, w)
+                    prev_count = min(j, w)
+                    drop = self.scores[j - w] if j >= w else 0.0
+                    prev = self.ma[w][j - 1] * prev_count if j > 0 else 0.0
+                    self.ma[w][j] = (prev - drop) / count
+                self.n = j + 1
+                self._add_period_hours(self.start + j, 0.0)
+
+        hours = float(hours or 0)
+        score = float(score or 0)
+
+        # Moving averages: the day is in the next w entries' windows
+        delta = score - self.scores[i]
+        if delta:
+            for w in WINDOWS:
+                idx = np.arange(i, min(i + w, self.n))
+                self.ma[w][idx] += delta / np.minimum(idx + 1, w)
+        self.scores[i] = score
+
+        # Streaks: replace the run(s) touching the day
+        old_hours = self.hours[i]
+        was_active, now_active = old_hours > 0, hours > 0
+        if was_active != now_active:
+            if was_active:
+                lo, hi = self._run_around(i)
+                self._remove_run(hi - lo + 1)
+                self.hours[i] = hours
+                if lo < i:
+                    self.runs[i - lo] += 1
+                if i < hi:
+                    self.runs[hi - i] += 1
+            else:
+                left = self._run_around(i - 1) if i > 0 and self.hours[i - 1] > 0 else None
+                right = self._run_around(i + 1) if i + 1 < self.n and self.hours[i + 1] > 0 else None
+                self._remove_run(left[1] - left[0] + 1 if left else 0)
+                self._remove_run(right[1] - right[0] + 1 if right else 0)
+                self.hours[i] = hours
+                lo, hi = self._run_around(i)
+                self.runs[hi - lo + 1] += 1
+
+        self.hours[i] = hours
+        self._add_period_hours(self.start + i, hours - old_hours)
+
+    def _add_period_hours(self, ordinal, delta):
+        day = pd.Timestamp.fromordinal(ordinal)
+        week = tuple(day.isocalendar()[:2])
+        month = (day.year, day.month)
+        self.weekly[week] = self.weekly.get(week, 0.0) + delta
+        self.monthly[month] = self.monthly.get(month, 0.0) + delta
+
+    @property
+    def current_streak(self):
+        if not self.n or self.hours[self.n - 1] <= 0:
+            # Today may not be logged yet, so a streak that ended yesterday still counts
+            if self.n > 1 and self.hours[self.n - 2] > 0:
+                lo, hi = self._run_around(self.n - 2)
+                return hi - lo + 1
+            return 0
+        lo, hi = self._run_around(self.n - 1)
+        return hi - lo + 1
+
+    @property
+    def longest_streak(self):
+        return max(self.runs) if self.runs else 0
+
+    # One row per day: Date, MA7, MA30
+    def moving_averages(self):
+        return pd.DataFrame({
+            'Date': self.dates().strftime('%Y-%m-%d'),
+            **{f'MA{w}': np.round(self.ma[w][:self.n], 2) for w in WINDOWS},
+        })
+
+    def weekly_totals(self):
+        return pd.Series(self.weekly, name='Hours').rename_axis(['Year', 'Week']).sort_index()
+
+    def monthly_totals(self):
+        return pd.Series(self.monthly, name='Hours').rename_axis(['Year', 'Month']).sort_index()
+
+
+# Analytics kept in a session dict between reruns. They are rebuilt when the
+# loaded log changes (base_key) or an edit falls before its first day;
+# otherwise only edited days whose hours differ from what was last applied
+# are replayed with set_day().
+def session_rolling_analytics(state, base_key, log, changed_dates):
+    if state.get('base') != base_key or 'analytics' not in state:
+        state['base'] = base_key
+        state['analytics'] = RollingAnalytics.from_log(log)
+        state['applied'] = {}
+    analytics, applied = state['analytics'], state['applied']
+    if changed_dates:
+        pos = log.positions(changed_dates)
+        hours, scores = log.hours, log.score
+        for date, p in zip(changed_dates, pos):
+            value = 0.0 if p < 0 or np.isnan(hours[p]) else float(hours[p])
+            if p >= 0 and applied.get(date) != value:
+                try:
+                    analytics.set_day(date, value, float(scores[p]))
+                except ValueError:
+                    state['analytics'] = analytics = RollingAnalytics.from_log(log)
+                applied[date] = value
+    return analytics
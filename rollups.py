@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+from edits import parse_hours
+from model import to_day_numbers
+
+# Pre-aggregated totals of the SQLite logs: days logged, Hours and Score per
+# user and for all users together (user ''), by ISO week ('2025-W03'), month
+# ('2025-01') and year ('2025'). SqliteStorage.save_changes() updates them in
+# the same transaction as the log, from the difference between the old and
+# new rows of the saved days, so leaderboards and period summaries read a
+# handful of rows instead of every user's history. Means are sums / days.
+
+GRAINS = ("week", "month", "year")
+GLOBAL = ""
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup (
+    user TEXT NOT NULL,
+    grain TEXT NOT NULL,
+    period TEXT NOT NULL,
+    days INTEGER NOT NULL,
+    hours REAL NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (user, grain, period)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rollup_rank ON rollup (grain, period, hours);
+"""
+
+
+# Period keys of 'YYYY-MM-DD' dates for one grain. The ISO week is that of
+# the week's Thursday (day 0, 1970-01-01, was a Thursday), and its year is
+# the Thursday's year.
+def period_keys(dates, grain):
+    days = to_day_numbers(dates)
+    if grain == "month":
+        return days.astype("datetime64[D]").astype("datetime64[M]").astype(str)
+    if grain == "year":
+        return days.astype("datetime64[D]").astype("datetime64[Y]").astype(str)
+    thursday = days - (days + 3) % 7 + 3
+    year = thursday.astype("datetime64[D]").astype("datetime64[Y]")
+    week = (thursday - year.astype("datetime64[D]").astype(np.int64)) // 7 + 1
+    return np.char.add(np.char.add(year.astype(str), "-W"), np.char.zfill(week.astype(str), 2))
+
+
+# Changes to the totals of each (grain, period) when the rows `old` are
+# replaced by `new` (Date/Score/Hours frames; a day missing from `new` was
+# deleted). Returns (grain, period, days, hours, score) tuples.
+def rollup_deltas(old, new):
+    dates = np.concatenate([old["Date"].astype(str).to_numpy(), new["Date"].astype(str).to_numpy()])
+    if not len(dates):
+        return []
+    sign = np.concatenate([np.full(len(old), -1.0), np.ones(len(new))])
+    hours = sign * np.concatenate([parse_hours(old["Hours"]), parse_hours(new["Hours"])])
+    score = sign * np.concatenate([
+        pd.to_numeric(frame["Score"], errors="coerce").fillna(0).to_numpy(dtype=float) for frame in (old, new)])
+    deltas = []
+    for grain in GRAINS:
+        keys, groups = np.unique(period_keys(dates, grain), return_inverse=True)
+        totals = [np.bincount(groups, weights, len(keys)) for weights in (sign, hours, score)]
+        for period, d, h, s in zip(keys, *totals):
+            if d != 0 or abs(h) > 1e-9 or abs(s) > 1e-9:
+                deltas.append((grain, str(period), int(round(d)), float(h), float(s)))
+    return deltas
+
+
+# Add deltas to a user's totals and to the all-users totals. Periods left
+# without logged days are removed. Runs inside the caller's transaction.
+def apply_deltas(conn, user, deltas):
+    rows = [(u, grain, period, days, hours, score) for grain, period, days, hours, score in deltas
+            for u in (user, GLOBAL)]
+    conn.executemany(
+        "INSERT INTO rollup (user, grain, period, days, hours, score) VALUES (?, ?, ?, ?, ?, ?)"
+        " ON CONFLICT (user, grain, period) DO UPDATE SET days = days + excluded.days,"
+        " hours = hours + excluded.hours, score = score + excluded.score",
+        rows,
+    )
+    conn.executemany("DELETE FROM rollup WHERE user = ? AND grain = ? AND period = ? AND days <= 0",
+                     [row[:3] for row in rows])
+
+
+# Recompute every total from exercise_log (for databases created before the
+# rollups, or to clear accumulated rounding), one user at a time
+def rebuild(conn):
+    conn.execute("DELETE FROM rollup")
+    users = [row[0] for row in conn.execute("SELECT DISTINCT user FROM exercise_log")]
+    for user in users:
+        log = pd.DataFrame(conn.execute("SELECT date, score, hours FROM exercise_log WHERE user = ?",
+                                        (user,)).fetchall(), columns=["Date", "Score", "Hours"])
+        apply_deltas(conn, user, rollup_deltas(log.iloc[:0], log))
+
+
+def _frame(rows, columns):
+    table = pd.DataFrame(rows, columns=columns)
+    table["Mean hours"] = (table["Hours"] / table["Days"]).round(2)
+    table["Mean score"] = (table["Score"] / table["Days"]).round(2)
+    table[["Hours", "Score"]] = table[["Hours", "Score"]].round(2)
+    return table
+
+
+# Periods with anything logged for one grain, newest first
+def periods(conn, grain):
+    return [row[0] for row in conn.execute(
+        "SELECT period FROM rollup WHERE user = ? AND grain = ? ORDER BY period DESC", (GLOBAL, grain))]
+
+
+# Top users of one period by total hours (or score, or days)
+def leaderboard(conn, grain, period, by="hours", limit=10):
+    if by not in ("hours", "score", "days"):
+        raise ValueError(f"cannot rank by {by!r}")
+    rows = conn.execute(
+        f"SELECT user, days, hours, score FROM rollup WHERE grain = ? AND period = ? AND user != ?"
+        f" ORDER BY {by} DESC, user LIMIT ?",
+        (grain, period, GLOBAL, limit),
+    ).fetchall()
+    table = _frame(rows, ["User", "Days", "Hours", "Score"])
+    table.insert(0, "Rank", range(1, len(table) + 1))
+    return table
+
+
+# Totals per period of one grain for a user (or all users), oldest first;
+# either end of the period range may be open
+def period_summary(conn, grain, user=GLOBAL, start=None, end=None):
+    rows = conn.execute(
+        "SELECT period, days, hours, score FROM rollup"
+        " WHERE user = ? AND grain = ? AND period >= ? AND period <= ? ORDER BY period",
+        (user, grain, start or "", end or "~"),
+    ).fetchall()
+    return _frame(rows, ["Period", "Days", "Hours", "Score"])
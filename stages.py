@@ -0,0 +1,152 @@
+import hashlib
+import time
+import numpy as np
+import pandas as pd
+from fingerprint import data_fingerprint
+
+
+# Content fingerprint of a stage input or output
+def fingerprint(value):
+    if hasattr(value, "fingerprint"):
+        return value.fingerprint()
+    if isinstance(value, (np.ndarray, pd.DataFrame, pd.Series)):
+        return data_fingerprint(value)
+    if isinstance(value, (tuple, list)):
+        return data_fingerprint(np.array([fingerprint(v) for v in value], dtype=object))
+    if isinstance(value, dict):
+        return fingerprint(sorted((str(k), fingerprint(v)) for k, v in value.items()))
+    if isinstance(value, bytes):
+        return hashlib.blake2b(value, digest_size=16).hexdigest()
+    return hashlib.blake2b(repr(value).encode(), digest_size=16).hexdigest()
+
+
+# A small dependency graph of named stages. Each stage is a function of its
+# dependencies (inputs set with set_input() or other stages), and remembers
+# the fingerprints of the dependencies it last ran on and the fingerprint of
+# what it returned. get() only reruns a stage when one of those fingerprints
+# changed; since outputs are fingerprinted by content, a stage that reruns
+# but returns the same data doesn't invalidate the stages after it.
+class StageGraph:
+    def __init__(self):
+        self.stages = {}
+        self.inputs = {}
+        self.memo = {}
+        self.stats = {}
+
+    def stage(self, name, deps):
+        def register(fn):
+            self.stages[name] = (fn, tuple(deps))
+            self.stats[name] = {"hits": 0, "misses": 0, "seconds": 0.0}
+            return fn
+        return register
+
+    # key: a fingerprint already computed by the caller
+    def set_input(self, name, value, key=None):
+        self.inputs[name] = (value, key if key is not None else fingerprint(value))
+
+    def _resolve(self, name):
+        if name in self.inputs:
+            return self.inputs[name]
+        fn, deps = self.stages[name]
+        resolved = [self._resolve(dep) for dep in deps]
+        dep_keys = tuple(key for _, key in resolved)
+        memo = self.memo.get(name)
+        if memo is not None and memo[0] == dep_keys:
+            self.stats[name]["hits"] += 1
+            return memo[1], memo[2]
+
+        start = time.perf_counter()
+        value = fn(*(value for value, _ in resolved))
+        key = fingerprint(value)
+        self.stats[name]["misses"] += 1
+        self.stats[name]["seconds"] += time.perf_counter() - start
+        self.memo[name] = (dep_keys, value, key)
+        return value, key
+
+    def get(self, name):
+        return self._resolve(name)[0]
+
+    def stats_table(self):
+        rows = []
+        for name, stats in self.stats.items():
+            runs = stats["hits"] + stats["misses"]
+            rows.append({"Stage": name, "Hits": stats["hits"], "Misses": stats["misses"],
+                         "Hit rate": round(stats["hits"] / runs, 2) if runs else 0.0,
+                         "Seconds": round(stats["seconds"], 4)})
+        return pd.DataFrame(rows)
+
+
+# The analysis pipeline of exercise_app.py: the loaded log and the pending
+# edits -> the edited log -> active days -> chart, the loaded log's trend sums
+# plus the edited days -> trend fits -> chart, and active days -> the
+# cross-validated trend model's forecast.
+# Inputs: "log" (DayLog), "pending" ({date: Hours text}) and "theme".
+def analysis_graph():
+    from forecast import select_trends
+    from model import EPOCH_ORDINAL, format_days, to_day_numbers
+    from trend import TrendAccumulator
+    graph = StageGraph()
+
+    @graph.stage("edited", ["log", "pending"])
+    def edited(log, pending):
+        log = log.copy()
+        return log, log.apply_edits(pending)
+
+    @graph.stage("active", ["edited"])
+    def active(edited):
+        days, scores = edited[0].active()
+        return days + EPOCH_ORDINAL, scores
+
+    # Trend sums of the log as loaded; only rebuilt when the loaded log changes
+    @graph.stage("base_trend", ["log"])
+    def base_trend(log):
+        days, scores = log.active()
+        return TrendAccumulator.from_series(days + EPOCH_ORDINAL, scores)
+
+    # The edited days are applied to a copy of the loaded log's sums, so an
+    # edit costs O(edited days) rather than a pass over the whole history
+    @graph.stage("fits", ["base_trend", "log", "edited"])
+    def fits(base_trend, log, edited):
+        edited_log, changed = edited
+        if base_trend.n == 0:
+            # No origin to center on yet; the edits are all there is
+            days, scores = edited_log.active()
+            trend = TrendAccumulator.from_series(days + EPOCH_ORDINAL, scores)
+        else:
+            trend = base_trend.copy()
+            days = to_day_numbers(changed).astype(np.int64) + EPOCH_ORDINAL
+            for day, old, new in zip(days, log.scores_at(changed), edited_log.scores_at(changed)):
+                if old > 0 and new > 0:
+                    trend.update(day, old, new)
+                elif old > 0:
+                    trend.remove(day, old)
+                elif new > 0:
+                    trend.add(day, new)
+        if trend.n < 2:
+            return None
+        return trend.linear(), trend.quadratic()
+
+    @graph.stage("chart", ["active", "fits", "theme"])
+    def chart(active, fits, theme):
+        if fits is None:
+            return None
+        # The plotting stack is only imported once there is something to plot
+        from charts import render_trend_chart
+        return render_trend_chart(*active, theme=theme, fits=fits)
+
+    # (Date-indexed Forecast/Low/High frame, chosen degree, CV RMSE), or None
+    # while there are too few days to cross-validate a trend or size its band
+    @graph.stage("forecast", ["active"])
+    def forecast(active):
+        if len(active[0]) < 2:
+            return None
+        models = select_trends([active])
+        days, mean, lower, upper = models.forecast()
+        rmse = float(models.cv_rmse[0])
+        if not np.isfinite(rmse) or np.isnan(upper[0]).any():
+            return None
+        index = pd.Index(format_days(days[0].astype(np.int64) - EPOCH_ORDINAL), name="Date")
+        table = pd.DataFrame({"Forecast": mean[0], "Low": lower[0], "High": upper[0]}, index=index)
+        return table, int(models.degree[0]), rmse
+
+    return graph
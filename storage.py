@@ -0,0 +1,363 @@
+import importlib.util
+import os
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import pandas as pd
+from data_loader import date_index, forget, load_day_log, load_raw_data, load_raw_range, read_log, slice_index
+from edits import parse_hours
+from gap_fill import midwest_today
+from model import DayLog
+from rollups import GLOBAL, ROLLUP_SCHEMA, apply_deltas, leaderboard, period_summary, periods, rebuild, rollup_deltas
+
+COLUMNS = ["Date", "Score", "Hours"]
+
+
+# Write a file next to its target and rename it into place, so readers never
+# see a partial file; the cached parse of the old file is dropped
+def _atomic_write(path, write):
+    tmp_path = f"{path}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+    forget(path)
+
+
+# Keep the last entry per date and store Hours as text (blank when missing)
+def merge_changes(base, changes):
+    merged = pd.concat([base[COLUMNS], changes[COLUMNS]], ignore_index=True)
+    merged["Date"] = merged["Date"].astype(str)
+    merged["Hours"] = merged["Hours"].astype(object).where(merged["Hours"].notna(), "").astype(str)
+    merged = merged.drop_duplicates("Date", keep="last")
+    return merged.sort_values("Date").reset_index(drop=True)
+
+
+# Sparse form: only days with hours (or a score) recorded are persisted. Rows
+# without are padding from older versions, or days blanked in the editor, and
+# are dropped on save; the missing days are filled in at view time.
+def is_padding(frame):
+    hours = parse_hours(frame["Hours"].astype(object).where(frame["Hours"].notna(), ""))
+    score = pd.to_numeric(frame["Score"], errors="coerce").fillna(0).to_numpy()
+    return (hours <= 0) & (score <= 0)
+
+
+def drop_padding(frame):
+    return frame[~is_padding(frame)].reset_index(drop=True)
+
+
+# The original format: one CSV holding the whole history, rewritten on every save
+class CsvStorage:
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        return load_raw_data(self.path)
+
+    def load_log(self, today=None):
+        return load_day_log(self.path, today)
+
+    # Rows between two dates (inclusive, 'YYYY-MM-DD'); either end may be open
+    def load_range(self, start=None, end=None):
+        return load_raw_range(self.path, start, end)
+
+    def save_changes(self, changes):
+        base = self.load() if self.exists() else pd.DataFrame(columns=COLUMNS)
+        merged = drop_padding(merge_changes(base, changes))
+        _atomic_write(self.path, lambda tmp: merged.to_csv(tmp, index=False))
+
+    # Rewrite a padded file in the sparse form; a no-op once it is sparse
+    def migrate(self):
+        if self.exists() and is_padding(self.load()).any():
+            self.save_changes(pd.DataFrame(columns=COLUMNS))
+
+
+# Saves append the changed rows to a small CSV change log, so their cost depends
+# on the number of edits. Once the log reaches compact_every rows it is folded
+# into a columnar base file (Parquet when pyarrow is installed, CSV otherwise)
+# that replaces the old one with an atomic rename. The original CSV is only
+# read to seed the base and can be regenerated with export_csv().
+class AppendLogStorage:
+    def __init__(self, path, compact_every=1000):
+        self.path = path
+        self.compact_every = compact_every
+        root = os.path.splitext(path)[0]
+        self.columnar = importlib.util.find_spec("pyarrow") is not None
+        self.base_path = root + (".parquet" if self.columnar else ".base.csv")
+        self.log_path = root + ".log.csv"
+        self._base = None
+        self._merged = None
+        self._logs = {}
+
+    def exists(self):
+        return any(os.path.exists(p) for p in (self.base_path, self.log_path, self.path))
+
+    def _base_identity(self):
+        if not os.path.exists(self.base_path):
+            return None
+        stat = os.stat(self.base_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load_base(self):
+        identity = self._base_identity()
+        if identity is None:
+            # Seed from the existing CSV for compatibility
+            return load_raw_data(self.path) if os.path.exists(self.path) else pd.DataFrame(columns=COLUMNS)
+        if self._base is None or self._base[0] != identity:
+            if self.columnar:
+                base = pd.read_parquet(self.base_path)
+            else:
+                base = pd.read_csv(self.base_path, dtype={"Hours": str}, keep_default_na=False)
+            self._base = (identity, base)
+        return self._base[1].copy()
+
+    def _log_entry(self):
+        return read_log(self.log_path) if os.path.exists(self.log_path) else None
+
+    def version(self):
+        log = self._log_entry()
+        return self._base_identity(), (log['size'], log['mtime']) if log else None
+
+    # The merged log and its date index, rebuilt when the base or log changed
+    def _current(self):
+        version = self.version()
+        if self._merged is None or self._merged[0] != version:
+            log = self._log_entry()
+            base = self._load_base()
+            # Blank rows in the log remove days from the base
+            merged = drop_padding(merge_changes(base, log['raw']) if log is not None and len(log['raw']) else base)
+            self._merged = (version, merged, date_index(merged))
+            self._logs = {}
+        return self._merged
+
+    def load(self):
+        return self._current()[1].copy()
+
+    def load_log(self, today=None):
+        if today is None:
+            today = midwest_today()
+        merged = self._current()[1]
+        log = self._logs.get(today)
+        if log is None:
+            log = DayLog.from_raw(merged, today)
+            self._logs = {today: log}
+        return log.copy()
+
+    # Rows between two dates (inclusive, 'YYYY-MM-DD'); either end may be open
+    def load_range(self, start=None, end=None):
+        return slice_index(self._current()[2], start, end)
+
+    def log_rows(self):
+        log = self._log_entry()
+        return len(log['raw']) if log else 0
+
+    def save_changes(self, changes):
+        if len(changes) == 0:
+            return
+        changes = merge_changes(pd.DataFrame(columns=COLUMNS), changes)
+        new_log = not os.path.exists(self.log_path)
+        with open(self.log_path, "a", newline="") as f:
+            changes.to_csv(f, index=False, header=new_log)
+        if self.log_rows() >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        merged = self.load()
+        if self.columnar:
+            _atomic_write(self.base_path, lambda tmp: merged.to_parquet(tmp, index=False))
+        else:
+            _atomic_write(self.base_path, lambda tmp: merged.to_csv(tmp, index=False))
+        # Replaying the log again would be harmless, so it is emptied only after the base is in place
+        _atomic_write(self.log_path, lambda tmp: pd.DataFrame(columns=COLUMNS).to_csv(tmp, index=False))
+
+    # Fold a padded base (or seed CSV) into a sparse base file
+    def migrate(self):
+        if self.exists() and is_padding(self._load_base()).any():
+            self.compact()
+
+    def export_csv(self, path=None):
+        merged = self.load()
+        _atomic_write(path or self.path, lambda tmp: merged.to_csv(tmp, index=False))
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS exercise_log (
+    user TEXT NOT NULL,
+    date TEXT NOT NULL,
+    score REAL NOT NULL DEFAULT 0,
+    hours TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (user, date)
+) WITHOUT ROWID
+"""
+
+
+# Idle connections kept per database file; a connection borrowed beyond these
+# is closed when it is returned
+POOL_SIZE = 4
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _open_connection(db_path):
+    # Pooled connections move between threads, but only one uses each at a time
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+# Per-user logs in one SQLite database (next to the CSV, with a .db suffix).
+# WAL mode lets sessions read while another one writes; the (user, date)
+# primary key is the index behind range queries, and saves are upserts.
+# Streamlit runs every rerun on a new thread, so connections are not tied to
+# threads: each query borrows one from a small pool per database file, shared
+# by all users, and gives it back. Weekly, monthly and yearly totals per user
+# and for everyone (rollups.py) are kept up to date by every save, for
+# leaderboards and period summaries.
+class SqliteStorage:
+    def __init__(self, path, user="default", db_path=None):
+        self.path = path
+        self.user = user or "default"
+        self.db_path = db_path or os.path.splitext(path)[0] + ".db"
+        with _pools_lock:
+            self._pool = _pools.setdefault(self.db_path, queue.LifoQueue(POOL_SIZE))
+        with self.connect() as conn, conn:
+            conn.execute(SQLITE_SCHEMA)
+            conn.executescript(ROLLUP_SCHEMA)
+
+    # Borrow a connection for a with block; use `with conn:` inside it for a
+    # transaction. One left mid-transaction by an error is rolled back.
+    @contextmanager
+    def connect(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = _open_connection(self.db_path)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def exists(self):
+        with self.connect() as conn:
+            row = conn.execute("SELECT 1 FROM exercise_log WHERE user = ? LIMIT 1", (self.user,)).fetchone()
+        return row is not None
+
+    # Rows between two dates (inclusive, 'YYYY-MM-DD'); either end may be open
+    def load_range(self, start=None, end=None):
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT date, score, hours FROM exercise_log"
+                " WHERE user = ? AND date >= ? AND date <= ? ORDER BY date",
+                (self.user, start or "0000-00-00", end or "9999-99-99"),
+            ).fetchall()
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def load(self):
+        return self.load_range()
+
+    def load_log(self, today=None):
+        return DayLog.from_raw(self.load(), today)
+
+    def save_changes(self, changes):
+        if len(changes) == 0:
+            return
+        changes = merge_changes(pd.DataFrame(columns=COLUMNS), changes)
+        padding = is_padding(changes)
+        rows = [(self.user, d, float(s), h) for d, s, h in changes[~padding][COLUMNS].itertuples(index=False)]
+        dates = changes["Date"]
+        with self.connect() as conn, conn:
+            # The old rows are read in the write transaction, so the rollup
+            # deltas can't miss a concurrent save
+            conn.execute("BEGIN IMMEDIATE")
+            old = pd.DataFrame(conn.execute(
+                "SELECT date, score, hours FROM exercise_log WHERE user = ? AND date >= ? AND date <= ?",
+                (self.user, dates.iloc[0], dates.iloc[-1]),
+            ).fetchall(), columns=COLUMNS)
+            old = old[old["Date"].isin(dates)]
+            conn.executemany(
+                "INSERT INTO exercise_log (user, date, score, hours) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (user, date) DO UPDATE SET score = excluded.score, hours = excluded.hours",
+                rows,
+            )
+            conn.executemany("DELETE FROM exercise_log WHERE user = ? AND date = ?",
+                             [(self.user, d) for d in changes["Date"][padding]])
+            apply_deltas(conn, self.user, rollup_deltas(old, changes[~padding]))
+
+    # Delete this user's padding rows, and build the rollups of a database
+    # from before they existed
+    def migrate(self):
+        log = self.load()
+        self.save_changes(log[is_padding(log)])
+        with self.connect() as conn:
+            empty = conn.execute("SELECT 1 FROM rollup LIMIT 1").fetchone() is None
+        if empty and self.exists():
+            self.rebuild_rollups()
+
+    def rebuild_rollups(self):
+        with self.connect() as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rebuild(conn)
+
+    # Periods of a grain ('week', 'month', 'year') with anything logged, newest first
+    def periods(self, grain):
+        with self.connect() as conn:
+            return periods(conn, grain)
+
+    def leaderboard(self, grain, period, by="hours", limit=10):
+        with self.connect() as conn:
+            return leaderboard(conn, grain, period, by, limit)
+
+    # This user's totals per period, or everyone's with everyone=True
+    def period_summary(self, grain, everyone=False, start=None, end=None):
+        with self.connect() as conn:
+            return period_summary(conn, grain, GLOBAL if everyone else self.user, start, end)
+
+    # Copy an existing exercise_data.csv into this user's log
+    def import_csv(self, csv_path=None):
+        self.save_changes(load_raw_data(csv_path or self.path))
+
+
+STORAGE_BACKENDS = {
+    "csv": CsvStorage,
+    "append": AppendLogStorage,
+    "sqlite": SqliteStorage,
+}
+# SQLite backends kept for the most recently opened users; older ones are
+# dropped (their autosaver is flushed and stopped) and reopened when needed
+MAX_SQLITE_USERS = 32
+_instances = OrderedDict()
+_instances_lock = threading.Lock()
+
+
+# Backends are kept between reruns so their caches survive, and padded logs
+# are migrated to the sparse form when first opened. Only the SQLite backend
+# keeps separate logs per user; the file backends share one log.
+def get_storage(path, kind="csv", user=None):
+    key = (kind, path, user if kind == "sqlite" else None)
+    evicted = []
+    with _instances_lock:
+        storage = _instances.get(key)
+        if storage is None:
+            if kind == "sqlite":
+                storage = SqliteStorage(path, user)
+            else:
+                storage = STORAGE_BACKENDS[kind](path)
+            storage.migrate()
+            _instances[key] = storage
+            users = [k for k in _instances if k[0] == "sqlite"]
+            evicted = [_instances.pop(k) for k in users[:max(len(users) - MAX_SQLITE_USERS, 0)]]
+        _instances.move_to_end(key)
+    if evicted:
+        from autosave import release_autosaver
+        for old in evicted:
+            release_autosaver(old)
+    return storage
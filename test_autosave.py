@@ -0,0 +1,42 @@
+import time
+import pandas as pd
+from autosave import AutoSaver
+
+# flush() must not return while the worker thread is still saving a batch it
+# took, or the exit-time flush_all() loses it.
+# Run with: python -m pytest test_autosave.py
+
+
+class SlowStorage:
+    def __init__(self):
+        self.saved = {}
+
+    def save_changes(self, changes):
+        time.sleep(0.3)
+        self.saved.update(zip(changes["Date"], changes["Hours"]))
+
+
+def row(date, hours):
+    return pd.DataFrame({"Date": [date], "Score": [0.0], "Hours": [hours]})
+
+
+def test_flush_waits_for_the_workers_batch():
+    storage = SlowStorage()
+    saver = AutoSaver(storage, delay=0.01)
+    saver.queue(row("2025-03-01", "2"))
+    time.sleep(0.1)  # the worker is now saving this row
+    assert saver.flush()
+    assert storage.saved == {"2025-03-01": "2"}
+    assert saver.unsaved == 0
+
+
+def test_close_saves_and_stops_the_worker():
+    storage = SlowStorage()
+    saver = AutoSaver(storage, delay=0.01)
+    saver.queue(row("2025-03-01", "2"))
+    assert saver.close()
+    assert not saver._thread.is_alive()
+    # Rows queued on a closed saver are still written
+    saver.queue(row("2025-03-02", "1"))
+    assert saver.flush()
+    assert storage.saved == {"2025-03-01": "2", "2025-03-02": "1"}
@@ -0,0 +1,56 @@
+import pandas as pd
+from activities import ActivityStorage
+from data_loader import cache_stats, clear_cache
+from storage import CsvStorage
+
+# Regression checks for the tail-append fast path of data_loader.read_log:
+# a full rewrite that grows the file and keeps its last bytes must be re-read,
+# not taken for an append. Run with: python -m pytest test_read_log.py
+
+
+def days(values, start=1):
+    return pd.DataFrame({
+        "Date": [f"2025-03-{start + i:02d}" for i in range(len(values))],
+        "Score": [round(v / 3, 2) for v in values],
+        "Hours": [str(v) for v in values],
+    })
+
+
+def test_growing_rewrite_is_reread(tmp_path):
+    clear_cache()
+    storage = CsvStorage(str(tmp_path / "exercise_data.csv"))
+    storage.save_changes(days([3.0] * 10))
+    assert storage.load()["Hours"].astype(float).tolist() == [3.0] * 10
+
+    # Fix an older day and log a new one in one save: the file is rewritten,
+    # grows, and still ends with the same bytes as before
+    storage.save_changes(pd.concat([days([6.0], start=2), days([3.0], start=11)]))
+    hours = storage.load().set_index("Date")["Hours"].astype(float)
+    assert hours["2025-03-02"] == 6.0
+    assert hours["2025-03-11"] == 3.0
+
+    # The next save starts from the loaded frame and must keep the fix
+    storage.save_changes(days([1.5], start=12))
+    on_disk = pd.read_csv(storage.path).set_index("Date")["Hours"]
+    assert on_disk["2025-03-02"] == 6.0
+
+
+def test_real_append_uses_fast_path(tmp_path):
+    clear_cache()
+    storage = ActivityStorage(str(tmp_path / "daily_data.csv"))
+    storage.add_entries([{"Date": "2025-03-01", "Activity": "Running", "Hour": "1"}])
+    storage.load()
+    appends = cache_stats["appends"]
+    storage.add_entries([{"Date": "2025-03-02", "Activity": "Yoga", "Hour": "2"}])
+    assert len(storage.load()) == 2
+    assert cache_stats["appends"] == appends + 1
+
+
+def test_save_day_rewrite_is_reread(tmp_path):
+    clear_cache()
+    storage = ActivityStorage(str(tmp_path / "daily_data.csv"))
+    storage.add_entries([{"Date": f"2025-03-{d:02d}", "Activity": "Running", "Hour": "1"} for d in range(1, 6)])
+    storage.load()
+    storage.save_day("2025-03-02", [{"Activity": "Running", "Hour": "2"}, {"Activity": "Yoga", "Hour": "1"}])
+    day = storage.load_log().day_entries("2025-03-02")
+    assert sorted(day["Activity"].astype(str)) == ["Running", "Yoga"]
@@ -0,0 +1,57 @@
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+# A reset of the page editor (clear_pending, after a save) must stop the
+# browser's copy of the old edits from coming back: the editor moves to a new
+# key, and edit state sent for the old one is ignored.
+# Run with: python -m pytest test_windowed_editor.py
+
+
+def editor_app(path):
+    import sys
+    sys.path.insert(0, ".")
+    import pandas as pd
+    import streamlit as st
+    from storage import CsvStorage
+    from windowed_editor import clear_pending, windowed_log_editor
+
+    storage = CsvStorage(path)
+    pending = st.session_state.setdefault("pending_edits", {})
+    windowed_log_editor(storage, "2025-03-10", pending)
+    if st.button("Save", key="save"):
+        storage.save_changes(pd.DataFrame({"Date": list(pending), "Score": 0, "Hours": list(pending.values())}))
+        clear_pending(pending)
+
+
+def edit(at, key, hours):
+    # What the browser sends for the editor: row 0 is the newest day, 2025-03-10
+    at.session_state[key] = {"edited_rows": {0: {"Hours": hours}}, "added_rows": [], "deleted_rows": []}
+    return at.run()
+
+
+def hours_on_disk(path):
+    return pd.read_csv(path).set_index("Date")["Hours"].astype(float).to_dict()
+
+
+def test_reset_editor_ignores_stale_edits(tmp_path):
+    path = str(tmp_path / "exercise_data.csv")
+    at = AppTest.from_function(editor_app, args=(path,), default_timeout=30).run()
+    first_key = "log_editor_0_2025-01-10"
+
+    edit(at, first_key, "2")
+    assert at.session_state["pending_edits"] == {"2025-03-10": "2"}
+    at.button(key="save").click().run()
+    assert hours_on_disk(path) == {"2025-03-10": 2.0}
+
+    # Another session saves a newer value for the same day
+    pd.DataFrame({"Date": ["2025-03-10"], "Score": [1.0], "Hours": ["3"]}).to_csv(path, index=False)
+
+    # The browser still holds the old editor's edits and sends them again
+    edit(at, first_key, "2")
+    assert at.session_state["pending_edits"] == {}
+    at.button(key="save").click().run()
+    assert hours_on_disk(path) == {"2025-03-10": 3.0}
+
+    # Each save resets the editor again; the current one still takes edits
+    edit(at, "log_editor_2_2025-01-10", "4")
+    assert at.session_state["pending_edits"] == {"2025-03-10": "4"}
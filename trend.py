@@ -0,0 +1,95 @@
+import numpy as np
+
+
+# Least-squares fit of Score against the day axis, solved from the normal equations
+class TrendFit:
+    def __init__(self, coef, origin, r2):
+        self.coef = coef  # lowest degree first, on the centered day axis
+        self.origin = origin
+        self.r2 = r2
+
+    def __repr__(self):
+        return f"TrendFit(coef={list(self.coef)}, origin={self.origin}, r2={self.r2})"
+
+    def predict(self, days):
+        x = np.asarray(days, dtype=float) - self.origin
+        return np.polyval(self.coef[::-1], x)
+
+
+# Running sufficient statistics for linear and quadratic trends. Days are
+# centered on a fixed origin (the middle of the first batch), which keeps the
+# powers of x small; raw toordinal() values around 7.4e5 make x^4 ill-conditioned.
+# Adding, removing or editing one day is O(1), and so is every fit.
+class TrendAccumulator:
+    def __init__(self, origin):
+        self.origin = float(origin)
+        self.n = 0
+        self.sx = np.zeros(5)   # Σx^0 .. Σx^4 (sx[0] is the count)
+        self.sxy = np.zeros(3)  # Σy, Σxy, Σx²y
+        self.syy = 0.0
+
+    @classmethod
+    def from_series(cls, days, scores, origin=None):
+        days = np.asarray(days, dtype=float)
+        scores = np.asarray(scores, dtype=float)
+        if origin is None:
+            origin = np.round((days.min() + days.max()) / 2) if len(days) else 0
+        trend = cls(origin)
+        x = days - trend.origin
+        # x^k by repeated multiplication; a float power per element is much slower
+        powers = np.empty((len(x), 5))
+        powers[:, 0] = 1.0
+        for k in range(1, 5):
+            np.multiply(powers[:, k - 1], x, out=powers[:, k])
+        trend.n = len(days)
+        trend.sx = powers.sum(axis=0)
+        trend.sxy = powers[:, :3].T @ scores
+        trend.syy = float(scores @ scores)
+        return trend
+
+    def copy(self):
+        trend = TrendAccumulator(self.origin)
+        trend.n, trend.sx, trend.sxy, trend.syy = self.n, self.sx.copy(), self.sxy.copy(), self.syy
+        return trend
+
+    def _update(self, day, score, sign):
+        x = float(day) - self.origin
+        powers = x ** np.arange(5)
+        self.n += sign
+        self.sx += sign * powers
+        self.sxy += sign * score * powers[:3]
+        self.syy += sign * score * score
+
+    def add(self, day, score):
+        self._update(day, score, 1)
+
+    def remove(self, day, score):
+        self._update(day, score, -1)
+
+    def update(self, day, old_score, new_score):
+        self.remove(day, old_score)
+        self.add(day, new_score)
+
+    def fit(self, degree):
+        size = degree + 1
+        gram = np.array([[self.sx[i + j] for j in range(size)] for i in range(size)])
+        rhs = self.sxy[:size]
+        try:
+            coef = np.linalg.solve(gram, rhs)
+        except np.linalg.LinAlgError:
+            coef = np.linalg.lstsq(gram, rhs, rcond=None)[0]
+
+        # R² from the sums: SSE = Σy² - coef·(Xᵀy), SST = Σy² - (Σy)²/n
+        sst = self.syy - self.sxy[0] ** 2 / self.n if self.n else 0.0
+        sse = max(self.syy - coef @ rhs, 0.0)
+        if sst <= 1e-12 * max(self.syy, 1.0):
+            r2 = 1.0 if sse <= 1e-12 * max(self.syy, 1.0) else 0.0
+        else:
+            r2 = 1 - sse / sst
+        return TrendFit(coef, self.origin, r2)
+
+    def linear(self):
+        return self.fit(1)
+
+    def quadratic(self):
+        return self.fit(2)
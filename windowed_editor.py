@@ -0,0 +1,105 @@
+import pandas as pd
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+from edits import apply_editor_edits
+from gap_fill import fill_window
+
+# Days shown per page of the log editor
+PAGE_DAYS = 60
+
+
+# One page of the log, loaded from the store: the complete calendar from
+# end - days + 1 to end, newest first, with Hours as text
+def load_page(storage, end, days=PAGE_DAYS):
+    end = pd.Timestamp(end).normalize()
+    start = end - pd.Timedelta(days=days - 1)
+    if storage.exists():
+        raw = storage.load_range(start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+    else:
+        raw = pd.DataFrame(columns=["Date", "Score", "Hours"])
+    page = fill_window(raw, start, end)
+    page["Hours"] = page["Hours"].astype(str)
+    return page.sort_values('Date', ascending=False).reset_index(drop=True)
+
+
+# Edits waiting to be merged (date -> Hours text) that fall on this page
+def overlay_pending(page, pending):
+    dates = set(page["Date"])
+    rows = [{"Date": d, "Hours": h} for d, h in pending.items() if d in dates]
+    return apply_editor_edits(page, {"added_rows": rows})[0] if rows else page
+
+
+# Rerun only the section (st.fragment) a button was clicked in, after a save.
+# A fragment's widgets normally trigger a run of just that fragment; when the
+# click was handled in a full-app run, the whole app reruns instead.
+def rerun_section():
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+
+def _shift_page(days):
+    st.session_state["page_end"] = st.session_state["page_end"] + pd.Timedelta(days=days).to_pytimedelta()
+
+
+# Paged log editor: shows one window of days with Older/Newer navigation and
+# a date picker, so only that window is sent to the browser. Edits are kept
+# in pending (survives page changes) and returned as the page frame.
+def windowed_log_editor(storage, today, pending, days=PAGE_DAYS, key="log_editor"):
+    today = pd.Timestamp(today).date()
+    st.session_state.setdefault("page_end", today)
+    if st.session_state["page_end"] > today:
+        st.session_state["page_end"] = today
+
+    older, newer = st.columns(2)
+    older.button("◀ Older", on_click=_shift_page, args=(-days,), use_container_width=True)
+    newer.button("Newer ▶", on_click=_shift_page, args=(days,), use_container_width=True,
+                 disabled=st.session_state["page_end"] >= today)
+    st.date_input("Show days up to", key="page_end", max_value=today)
+
+    page = overlay_pending(load_page(storage, st.session_state["page_end"], days), pending)
+    editor_key = f"{key}_{editor_generation(key)}_{page['Date'].iat[-1]}"
+    st.data_editor(
+        page,
+        column_config={
+            "Date": st.column_config.TextColumn(disabled=True),
+            "Score": st.column_config.NumberColumn(disabled=True),
+            "Hours": st.column_config.TextColumn()
+        },
+        num_rows="fixed",
+        key=editor_key
+    )
+    page, changed = apply_editor_edits(page, st.session_state.get(editor_key))
+    if changed:
+        hours = page.set_index("Date")["Hours"]
+        for date in changed:
+            pending[date] = hours[date]
+    return page
+
+
+# Resets of a session's page editors. A keyed data_editor keeps its edits in
+# the browser across reruns, and deleting its session_state entry doesn't
+# clear them, so a reset moves the editors to new keys instead.
+def editor_generation(key="log_editor"):
+    return st.session_state.get("editor_generations", {}).get(key, 0)
+
+
+# Forget pending edits and reset the page editors, e.g. after a save
+def clear_pending(pending, key="log_editor"):
+    pending.clear()
+    generations = st.session_state.setdefault("editor_generations", {})
+    generations[key] = generations.get(key, 0) + 1
+    for state_key in [k for k in st.session_state if str(k).startswith(f"{key}_")]:
+        del st.session_state[state_key]
+
+
+# Autosave a session's edited rows. Rows the session already queued with the
+# same value are skipped (see AutoSaver.queue), and once everything queued is
+# written the pending edits are dropped and the editors reset, so the page
+# shows what is on disk, including newer saves from other sessions.
+def autosave_pending(saver, changes, pending, key="log_editor"):
+    queued = st.session_state.setdefault(f"autosaved_{key}", {})
+    if saver.queue(changes, queued) == 0 and pending and saver.unsaved == 0 and saver.last_error is None:
+        clear_pending(pending, key)
+        queued.clear()